@@ -0,0 +1,50 @@
+# Powiadamianie otwartych strumieni SSE o nowych alertach zużycia.
+# Alerty są zapisywane w bazie; ten obiekt tylko budzi strumienie tego procesu zaraz po
+# zatwierdzeniu transakcji. Strumienie i tak co kilka sekund sprawdzają bazę, więc alerty
+# zapisane przez inne procesy (wielu workerów) też dotrą, najwyżej z tym opóźnieniem.
+import threading
+
+
+class AlertBroadcaster:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generation = 0
+        self.open_streams = 0
+
+    def open_stream(self, limit):
+        # Każdy strumień zajmuje wątek workera do rozłączenia klienta - powyżej limitu odmawiamy,
+        # żeby zostały wątki dla zwykłych żądań API
+        with self._condition:
+            if self.open_streams >= limit:
+                return False
+            self.open_streams += 1
+            return True
+
+    def close_stream(self):
+        with self._condition:
+            self.open_streams -= 1
+
+    def notify(self):
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def generation(self):
+        with self._condition:
+            return self._generation
+
+    def wait(self, generation, timeout):
+        # Czeka na powiadomienie nowsze niż "generation"; zwraca bieżącą generację
+        with self._condition:
+            self._condition.wait_for(lambda: self._generation != generation, timeout=timeout)
+            return self._generation
+
+
+def format_sse(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.splitlines() or [''])
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,49 @@
+# Śledzenie zmian dla synchronizacji przyrostowej (/changes).
+# Każdy zapisany wiersz dostaje w kolumnie change_version numer wersji danych transakcji, która go
+# zapisała (bieżąca wersja + 1 - wersja jest podbijana przy zatwierdzeniu, już po zapisie wierszy).
+# Usunięcia trafiają do tabeli change_tombstone. Wszystko utrzymują triggery, więc zmiany z ORM,
+# zapytań zbiorczych, importu i kaskad są widoczne tak samo.
+from sqlalchemy import text
+
+
+# Rodzaj -> (tabela, kolumny klucza zapisywane w nagrobku jako ref_id i ref_id2)
+CHANGE_SOURCES = {
+    'cars': ('car', ('id',)),
+    'parts': ('part', ('id',)),
+    'part_types': ('part_type', ('id',)),
+    'events': ('event', ('id',)),
+    'assignments': ('car_event', ('car_id', 'event_id')),
+}
+
+NEXT_VERSION_SQL = "(SELECT coalesce(max(version), 0) + 1 FROM data_version)"
+
+
+def _trigger_sql(kind):
+    table, key = CHANGE_SOURCES[kind]
+    stamp = f"UPDATE {table} SET change_version = {NEXT_VERSION_SQL} WHERE rowid = NEW.rowid"
+    ref_ids = ", ".join(f"OLD.{column}" for column in key) + (", NULL" if len(key) == 1 else "")
+    tombstone = (
+        "INSERT INTO change_tombstone(kind, ref_id, ref_id2, change_version, deleted_at) "
+        f"VALUES ('{kind}', {ref_ids}, {NEXT_VERSION_SQL}, CURRENT_TIMESTAMP)"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS change_{table}_ai AFTER INSERT ON {table} BEGIN {stamp}; END",
+        # WHEN pomija aktualizację wykonaną przez sam trigger (zmienia tylko change_version)
+        f"CREATE TRIGGER IF NOT EXISTS change_{table}_au AFTER UPDATE ON {table} "
+        f"WHEN NEW.change_version IS OLD.change_version BEGIN {stamp}; END",
+        f"CREATE TRIGGER IF NOT EXISTS change_{table}_ad AFTER DELETE ON {table} BEGIN {tombstone}; END",
+    ]
+
+
+def change_trigger_names():
+    return [
+        f"change_{table}_{suffix}"
+        for table, _ in CHANGE_SOURCES.values()
+        for suffix in ('ai', 'au', 'ad')
+    ]
+
+
+def create_change_triggers(connection):
+    for kind in CHANGE_SOURCES:
+        for statement in _trigger_sql(kind):
+            connection.execute(text(statement))
@@ -0,0 +1,299 @@
+# Polecenia CLI (flask --app app <polecenie>) i narzędzia migracji bazy (flask db ...).
+# Moduł jest importowany przez create_app tylko przy uruchomieniu z wiersza poleceń.
+import gzip
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flask.json.provider import DefaultJSONProvider
+from flask_migrate import Migrate, stamp
+
+from changes import create_change_triggers
+from deleted_parts import create_deleted_part_trigger
+from extensions import db, read_cache
+from models import (
+    Car, CarHistory, CarHistoryArchive, Event, FleetSnapshot, Part, PartHistory, PartHistoryArchive, PartType
+)
+from query_plans import StatementRecorder, explain, plan_violations
+from responses import RESPONSE_FORMATS
+from search import create_search_index
+from storage import READER_BIND
+from views.fleet import take_fleet_snapshot
+from views.history import archive_history, compact_history
+from views.transfer import IMPORT_CHUNK_SIZE, BulkImport, iter_import_records
+from wear import create_wear_triggers
+
+# Grupa tylko zbiera polecenia - register_commands dodaje je do app.cli pojedynczo
+commands = AppGroup('commands')
+
+
+# Funkcja do inicjalizacji bazy danych (w kontekście aplikacji)
+def init_db():
+    db.create_all()
+    # Indeks FTS5 i triggery synchronizujące (tabele wirtualne nie powstają w create_all)
+    with db.engine.begin() as connection:
+        create_search_index(connection)
+        create_wear_triggers(connection)
+        create_change_triggers(connection)
+        create_deleted_part_trigger(connection)
+
+
+@commands.command('import-data')
+@click.argument('kind', type=click.Choice(['part-types', 'cars', 'parts']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), default=None)
+@click.option('--chunk-size', default=IMPORT_CHUNK_SIZE, show_default=True)
+def import_data_command(kind, path, fmt, chunk_size):
+    """Masowy import typów części, samochodów lub części z pliku CSV/NDJSON."""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        report = BulkImport(kind, chunk_size).run(iter_import_records(stream, fmt))
+
+    click.echo(f"Imported {report['imported']} {kind}, {report['error_count']} errors")
+    for error in report['errors']:
+        click.echo(f"  row {error['row']}: {error['error']}")
+
+
+@commands.command('compact-history')
+@click.option('--compact-after-days', type=int, default=None, help='Domyślnie HISTORY_COMPACT_AFTER_DAYS.')
+@click.option('--archive-after-days', type=int, default=None, help='Domyślnie HISTORY_ARCHIVE_AFTER_DAYS.')
+def compact_history_command(compact_after_days, archive_after_days):
+    """Scala dzienne wpisy przebiegu i przenosi starą historię do archiwum."""
+    if compact_after_days is None:
+        compact_after_days = current_app.config['HISTORY_COMPACT_AFTER_DAYS']
+    if archive_after_days is None:
+        archive_after_days = current_app.config['HISTORY_ARCHIVE_AFTER_DAYS']
+
+    # Scalamy tylko pełne dni, żeby nie łączyć wpisów z dnia, który jeszcze trwa
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    removed = compact_history(today - timedelta(days=compact_after_days - 1))
+    click.echo(f"Compacted part history: {removed} mileage entries merged")
+
+    horizon = datetime.utcnow() - timedelta(days=archive_after_days)
+    moved_parts = archive_history(PartHistory, PartHistoryArchive, horizon)
+    moved_cars = archive_history(CarHistory, CarHistoryArchive, horizon)
+    click.echo(f"Archived {moved_parts} part history and {moved_cars} car history entries older than {horizon:%Y-%m-%d}")
+
+
+@commands.command('snapshot-fleet')
+@click.option('--force', is_flag=True, help='Utwórz punkt kontrolny niezależnie od FLEET_SNAPSHOT_INTERVAL_DAYS.')
+def snapshot_fleet_command(force):
+    """Zapisuje punkt kontrolny stanu floty (uruchamiać okresowo, np. z crona)."""
+    latest = db.session.scalar(db.select(db.func.max(FleetSnapshot.taken_at)))
+    interval = timedelta(days=current_app.config['FLEET_SNAPSHOT_INTERVAL_DAYS'])
+    if not force and latest is not None and datetime.utcnow() - latest < interval:
+        click.echo(f"Latest snapshot from {latest:%Y-%m-%d %H:%M} is recent enough, skipping")
+        return
+    snapshot = take_fleet_snapshot()
+    db.session.commit()
+    click.echo(f"Fleet snapshot {snapshot.id} saved with {snapshot.part_count} parts")
+
+
+# Kontrola planów zapytań endpointów listujących i szczegółowych.
+# (URL, tabele, które wolno przeglądać w całości, czy dozwolone sortowanie w tymczasowym B-drzewie)
+# Listy zwracające wszystkie wiersze muszą przejrzeć tabelę główną, ale nie mogą skanować tabel złączonych.
+QUERY_PLAN_CHECKS = [
+    ('/get-cars', ('car', 'car_event'), False),
+    ('/get-car/{car_id}', (), False),
+    ('/get-parts', ('part',), False),
+    ('/get-parts?sort=name', ('part',), False),
+    ('/get-parts?sort=part_number&order=desc', ('part',), False),
+    # Wyszukiwanie: id z indeksu FTS5, części po kluczu - sortowane są tylko dopasowane wiersze
+    ('/get-parts?search=a', (), True),
+    # Sortowanie po wyliczonym zużyciu i po kolumnie złączonej tabeli zawsze wymaga sortowania
+    ('/get-parts?sort=usage_percentage', ('part',), True),
+    ('/get-parts?sort=car_chassis_number', ('part',), True),
+    ('/get-parts-for-car/{car_id}', (), False),
+    ('/get-part/{part_id}', (), False),
+    ('/get-part-types', ('part_type',), False),
+    ('/get-part-type/{part_type_id}', (), False),
+    ('/get-events', ('event',), False),
+    ('/get-event/{event_id}', (), False),
+    ('/get-cars-for-event/{event_id}', (), False),
+    ('/get-events-for-car/{car_id}', (), False),
+    # Wydarzenia auta sortowane po dacie - kilka wierszy, sortowanie dozwolone
+    ('/cars/{car_id}/overview', (), True),
+    ('/cars/{car_id}/overview?fields=parts', (), False),
+    ('/part-history/{part_id}', (), False),
+    ('/part-history/{part_id}?order=asc&changed_field=mileage', (), False),
+    ('/car-history/{car_id}', (), False),
+    ('/car-history/{car_id}?since=2020-01-01&until=2100-01-01', (), False),
+    ('/search?q=a', (), False),
+    ('/changes?since=1000000', (), True),
+    # Części do wymiany wybierane zakresem po indeksie pozostałego przebiegu; grupowanie wymaga sortowania
+    ('/parts/due', ('part_type',), True),
+    # Stan floty: bieżące części przeglądane w całości, zmiany z okresu zawężone indeksami po czasie
+    ('/as-of?at=2026-01-01', ('part',), True),
+    ('/as-of?at=2100-01-01', ('part',), True),  # Od ostatniego punktu kontrolnego (flask snapshot-fleet)
+    ('/as-of?event_id={event_id}&car_id={car_id}', ('part',), True),
+    ('/parts/due?threshold=50&within=200', ('part_type',), True),
+    # Raport grupuje wynik zapytania zawężonego indeksem - sortowanie grup jest dozwolone
+    ('/mileage-report?car_id={car_id}&since=2020-01-01', (), True),
+    ('/mileage-report?part_id={part_id}&group_by=month', (), True),
+    ('/mileage-report?event_id={event_id}&group_by=car', (), True),
+    # Otwarte alerty z indeksu po dacie potwierdzenia (rowid w indeksie daje kolejność bez sortowania)
+    ('/alerts', (), False),
+    ('/alerts?car_id={car_id}&status=all', (), False),
+]
+
+
+@commands.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Wypisz plany wszystkich zapytań.')
+def check_query_plans_command(verbose):
+    """Sprawdza EXPLAIN QUERY PLAN zapytań endpointów (uruchamiać na bazie z danymi)."""
+    reader = db.engines[READER_BIND]
+    tables = set(db.metadata.tables)
+    ids = {
+        'car_id': db.session.scalar(db.select(db.func.min(Car.id))) or 1,
+        'part_id': db.session.scalar(db.select(db.func.min(Part.id))) or 1,
+        'part_type_id': db.session.scalar(db.select(db.func.min(PartType.id))) or 1,
+        'event_id': db.session.scalar(db.select(db.func.min(Event.id))) or 1,
+    }
+    db.session.remove()
+
+    client = current_app.test_client()
+    failures = 0
+    for url, allowed_scans, allow_temp_sort in QUERY_PLAN_CHECKS:
+        url = url.format(**ids)
+        read_cache.clear()  # Odpowiedź z pamięci podręcznej nie wysłałaby żadnego zapytania
+        with StatementRecorder(reader) as recorder:
+            client.get(url)
+
+        with reader.connect() as connection:
+            for statement, parameters in recorder.statements:
+                plan = explain(connection, statement, parameters)
+                violations = plan_violations(plan, tables, allowed_scans, allow_temp_sort)
+                if violations:
+                    failures += 1
+                    click.echo(f"FAIL {url}: {'; '.join(violations)}")
+                    click.echo(f"     {' '.join(statement.split())}")
+                elif verbose:
+                    click.echo(f"ok   {url}: {'; '.join(plan)}")
+
+    if failures:
+        raise SystemExit(f"{failures} queries fall back to a table scan or temporary sort")
+    click.echo(f"All query plans OK ({len(QUERY_PLAN_CHECKS)} endpoints)")
+
+
+# Endpointy list porównywane przez benchmark-formats (format wierszowy i kolumnowy)
+FORMAT_BENCHMARKS = [
+    '/get-parts?limit=500',
+    '/get-cars',
+    '/get-events',
+    '/part-history/{part_id}?limit=500',
+    '/car-history/{car_id}?limit=500',
+]
+
+
+@commands.command('benchmark-formats')
+@click.option('--repeat', type=int, default=20, help='Liczba powtórzeń kodowania (mediana).')
+def benchmark_formats_command(repeat):
+    """Porównuje rozmiar i czas kodowania odpowiedzi list: json/orjson, wiersze/kolumny, gzip."""
+    ids = {
+        'car_id': db.session.scalar(db.select(db.func.min(Car.id))) or 1,
+        'part_id': db.session.scalar(db.select(db.func.min(Part.id))) or 1,
+    }
+    db.session.remove()
+    client = current_app.test_client()
+    encoders = {
+        'json': DefaultJSONProvider(current_app._get_current_object()).dumps,
+        'orjson': current_app.json.dumps,
+    }
+
+    click.echo(f"{'endpoint':<40} {'format':<9} {'bytes':>9} {'gzip':>8} {'json ms':>8} {'orjson ms':>9}")
+    for url in FORMAT_BENCHMARKS:
+        url = url.format(**ids)
+        for fmt in RESPONSE_FORMATS:
+            separator = '&' if '?' in url else '?'
+            response = client.get(f"{url}{separator}format={fmt}", headers={'Accept-Encoding': 'identity'})
+            if response.status_code != 200:
+                click.echo(f"{url:<40} {fmt:<9} HTTP {response.status_code}")
+                continue
+            payload = response.get_json()
+            body = current_app.json.dumps(payload).encode()
+            timings = {}
+            for name, encode in encoders.items():
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    encode(payload)
+                    samples.append(time.perf_counter() - started)
+                timings[name] = statistics.median(samples) * 1000
+            compressed = len(gzip.compress(body, compresslevel=current_app.config['COMPRESS_LEVEL']))
+            click.echo(f"{url:<40} {fmt:<9} {len(body):>9} {compressed:>8} "
+                       f"{timings['json']:>8.2f} {timings['orjson']:>9.2f}")
+
+
+
+
+# Schemat tworzy się raz, poleceniem, a nie przy każdym starcie serwera:
+# flask --app app init-db (nowa baza) albo flask --app app db upgrade (istniejąca)
+@commands.command('init-db')
+def init_db_command():
+    """Tworzy tabele, indeks wyszukiwania i triggery w nowej bazie."""
+    init_db()
+    # Schemat odpowiada najnowszej migracji - oznaczamy ją, żeby kolejne "flask db upgrade" działały
+    stamp()
+    click.echo("Database initialized")
+
+
+# Czas zimnego startu: import aplikacji, create_app i pierwsze żądanie, każdy pomiar w nowym procesie
+# (w procesie polecenia wszystko jest już zaimportowane)
+STARTUP_BENCHMARK_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get(sys.argv[1]).status_code
+finished = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create_app': created - imported,
+                  'first_request': finished - created, 'status': status}))
+"""
+STARTUP_PHASES = ('import', 'create_app', 'first_request')
+
+
+@commands.command('benchmark-startup')
+@click.option('--repeat', type=int, default=5, help='Liczba uruchomień (mediana).')
+@click.option('--url', default='/get-cars', show_default=True, help='Adres pierwszego żądania.')
+@click.option('--max-ms', type=float, default=None, help='Błąd, gdy czas do obsługi pierwszego żądania przekroczy limit.')
+def benchmark_startup_command(repeat, url, max_ms):
+    """Mierzy czas importu, create_app i pierwszego żądania w nowym procesie Pythona."""
+    samples = {phase: [] for phase in STARTUP_PHASES + ('process',)}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-c', STARTUP_BENCHMARK_SCRIPT, url],
+            cwd=current_app.root_path, capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            raise SystemExit(f"Startup failed:\n{result.stderr}")
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        if timings['status'] != 200:
+            raise SystemExit(f"First request to {url} returned HTTP {timings['status']}")
+        for phase in STARTUP_PHASES:
+            samples[phase].append(timings[phase] * 1000)
+        samples['process'].append(elapsed * 1000)
+
+    medians = {phase: statistics.median(values) for phase, values in samples.items()}
+    for phase, value in medians.items():
+        click.echo(f"{phase:<14} {value:>8.1f} ms")
+    ready = sum(medians[phase] for phase in STARTUP_PHASES)
+    click.echo(f"{'ready':<14} {ready:>8.1f} ms (import + create_app + first request)")
+    if max_ms is not None and ready > max_ms:
+        raise SystemExit(f"Startup took {ready:.1f} ms, limit is {max_ms:.1f} ms")
+
+
+def register_commands(app):
+    # Wywoływane tylko dla poleceń CLI - serwer nie importuje narzędzi migracji (alembic)
+    Migrate(app, db)
+    for command in commands.commands.values():
+        app.cli.add_command(command)
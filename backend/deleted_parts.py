@@ -0,0 +1,28 @@
+# Zapis usuniętych części dla stanu floty na wybraną chwilę (/as-of).
+# Usunięcie części kasuje jej wpisy rejestru przebiegu i historii (ON DELETE CASCADE), więc trigger
+# BEFORE DELETE - jeszcze przed kaskadą - kopiuje ostatni stan części do deleted_part, a jej zmiany
+# przebiegu i przeniesienia między autami do deleted_part_change. /as-of odtwarza z nich stan części
+# usuniętych po wybranej chwili (cofając się od stanu z chwili usunięcia).
+from sqlalchemy import text
+
+
+DELETED_PART_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS fleet_part_bd BEFORE DELETE ON part BEGIN "
+    "INSERT INTO deleted_part (part_id, name, part_number, part_type_id, car_id, mileage, created_at, deleted_at) "
+    "VALUES (OLD.id, OLD.name, OLD.part_number, OLD.part_type_id, OLD.car_id, OLD.mileage, OLD.created_at, "
+    "CURRENT_TIMESTAMP); "
+    "INSERT INTO deleted_part_change (deletion_id, changed_field, old_value, new_value, timestamp) "
+    "SELECT (SELECT max(id) FROM deleted_part), 'mileage', odometer - delta, odometer, timestamp "
+    "FROM mileage_ledger WHERE part_id = OLD.id; "
+    "INSERT INTO deleted_part_change (deletion_id, changed_field, old_value, new_value, timestamp) "
+    "SELECT (SELECT max(id) FROM deleted_part), changed_field, old_value, new_value, timestamp "
+    "FROM part_history WHERE part_id = OLD.id AND changed_field = 'car_id' AND timestamp IS NOT NULL "
+    "UNION ALL "
+    "SELECT (SELECT max(id) FROM deleted_part), changed_field, old_value, new_value, timestamp "
+    "FROM part_history_archive WHERE part_id = OLD.id AND changed_field = 'car_id' AND timestamp IS NOT NULL; "
+    "END"
+)
+
+
+def create_deleted_part_trigger(connection):
+    connection.execute(text(DELETED_PART_TRIGGER))
@@ -0,0 +1,13 @@
+# Rozszerzenia i obiekty współdzielone przez moduły aplikacji. Tworzone bez aplikacji,
+# wiązane z nią w create_app (app.py), więc import modeli i widoków nie wymaga instancji Flask.
+from flask_sqlalchemy import SQLAlchemy
+
+from alerts import AlertBroadcaster
+from forecast import WearForecast
+from read_cache import ReadCache
+from storage import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+read_cache = ReadCache()  # Rozmiar z READ_CACHE_SIZE
+wear_forecast = WearForecast()  # Okno z FORECAST_WINDOW_DAYS
+alert_broadcaster = AlertBroadcaster()
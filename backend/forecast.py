@@ -0,0 +1,236 @@
+# Prognoza zużycia części: kiedy przebieg części dojdzie do limitu jej typu (max_mileage).
+# Tempo zużycia (km/dzień i km/wydarzenie) liczone jest wektorowo w NumPy z rejestru przebiegu
+# (mileage_ledger) wczytanego jednym zapytaniem. Tempo zależy tylko od historii części, więc
+# przy kolejnym wywołaniu przeliczamy je wyłącznie dla części z nowymi wpisami w rejestrze;
+# stan licznika i limit czytamy za każdym razem (jedno zapytanie po tabeli part).
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam, text
+
+np = None  # NumPy wczytywany przy pierwszej prognozie (forecast_available), nie przy starcie aplikacji
+
+
+FORECAST_WINDOW_DAYS = 180  # Tempo zużycia z ostatnich tylu dni
+FORECAST_QUERY_CHUNK = 500  # Liczba części w jednym "IN (...)" przy przeliczeniu przyrostowym
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+LEDGER_QUERY = (
+    "SELECT part_id, coalesce(event_id, -1), delta, julianday(timestamp) "
+    "FROM mileage_ledger WHERE timestamp >= :since"
+)
+PARTS_QUERY = (
+    "SELECT part.id, part.car_id, part.mileage, part.remaining_mileage, part_type.max_mileage "
+    "FROM part JOIN part_type ON part_type.id = part.part_type_id "
+    "WHERE part.remaining_mileage IS NOT NULL"
+)
+
+
+def forecast_available():
+    # Prognoza jest opcjonalna - bez NumPy reszta API działa normalnie
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+    return True
+
+
+def lookup(ids, values, keys, default):
+    # Wartości dla kluczy z posortowanej tablicy ids (default dla brakujących)
+    if not len(ids):
+        return np.full(len(keys), default)
+    position = np.minimum(np.searchsorted(ids, keys), len(ids) - 1)
+    return np.where(ids[position] == keys, values[position], default)
+
+
+def consumption_rates(rows, now):
+    # rows: (part_id, event_id lub -1, przyrost, julianday) -> (id części, km/dzień, km/wydarzenie)
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+    data = np.array(rows, dtype=np.float64)
+    part_ids = data[:, 0].astype(np.int64)
+    event_ids = data[:, 1].astype(np.int64)
+    distance = np.clip(data[:, 2], 0, None)  # Ujemny przyrost to korekta licznika, nie jazda
+    days = data[:, 3]
+
+    ids, index = np.unique(part_ids, return_inverse=True)
+    count = len(ids)
+    total = np.bincount(index, weights=distance, minlength=count)
+
+    # Tempo dzienne od pierwszego wpisu w oknie do dziś (co najmniej jeden dzień)
+    first = np.full(count, np.inf)
+    np.minimum.at(first, index, days)
+    per_day = total / np.maximum(now - first, 1.0)
+
+    # Tempo na wydarzenie: km przejechane na wydarzeniach / liczba różnych wydarzeń części
+    on_event = event_ids >= 0
+    event_total = np.bincount(index[on_event], weights=distance[on_event], minlength=count)
+    pairs = np.unique(np.stack([index[on_event], event_ids[on_event]]), axis=1)
+    events = np.bincount(pairs[0], minlength=count)
+    per_event = np.full(count, np.nan)
+    np.divide(event_total, events, out=per_event, where=events > 0)
+
+    return ids, per_day, per_event
+
+
+class WearForecast:
+    def __init__(self, window_days=FORECAST_WINDOW_DAYS):
+        self.window_days = window_days
+        self._lock = threading.Lock()
+        self._ids = None  # Posortowane id części i ich tempo zużycia
+        self._per_day = None
+        self._per_event = None
+        self._last_entry_id = 0
+        self._computed_on = None
+        self.last_recomputed = 0
+
+    def _load_rates(self, connection, today, part_ids=None):
+        since = datetime.combine(today - timedelta(days=self.window_days), datetime.min.time())
+        now = time.time() / 86400 + UNIX_EPOCH_JULIAN_DAY  # Ta sama skala co julianday() w SQLite
+        if part_ids is None:
+            rows = connection.execute(text(LEDGER_QUERY), {'since': since}).all()
+        else:
+            query = text(LEDGER_QUERY + " AND part_id IN :ids").bindparams(bindparam('ids', expanding=True))
+            rows = []
+            for start in range(0, len(part_ids), FORECAST_QUERY_CHUNK):
+                chunk = [int(part_id) for part_id in part_ids[start:start + FORECAST_QUERY_CHUNK]]
+                rows.extend(connection.execute(query, {'since': since, 'ids': chunk}).all())
+        return consumption_rates(rows, now)
+
+    def refresh(self, connection):
+        # Pełne przeliczenie raz dziennie (okno się przesuwa) albo gdy rejestr się skurczył
+        # (usunięte części); w pozostałych przypadkach tylko części z nowymi wpisami
+        today = date.today()
+        last_entry_id = connection.execute(text("SELECT coalesce(max(id), 0) FROM mileage_ledger")).scalar()
+        with self._lock:
+            if self._computed_on != today or last_entry_id < self._last_entry_id:
+                self._ids, self._per_day, self._per_event = self._load_rates(connection, today)
+                self.last_recomputed = len(self._ids)
+            elif last_entry_id > self._last_entry_id:
+                changed = np.array(connection.execute(
+                    text("SELECT DISTINCT part_id FROM mileage_ledger WHERE id > :last_id"),
+                    {'last_id': self._last_entry_id}
+                ).scalars().all(), dtype=np.int64)
+                ids, per_day, per_event = self._load_rates(connection, today, changed)
+                keep = ~np.isin(self._ids, changed)
+                ids = np.concatenate([self._ids[keep], ids])
+                order = np.argsort(ids)
+                self._ids = ids[order]
+                self._per_day = np.concatenate([self._per_day[keep], per_day])[order]
+                self._per_event = np.concatenate([self._per_event[keep], per_event])[order]
+                self.last_recomputed = len(changed)
+            else:
+                self.last_recomputed = 0
+            self._last_entry_id = last_entry_id
+            self._computed_on = today
+            return self._ids, self._per_day, self._per_event
+
+    def parts(self, connection, car_id=None):
+        # Prognoza dla wszystkich części z limitem przebiegu (opcjonalnie jednego samochodu)
+        rate_ids, per_day, per_event = self.refresh(connection)
+        query = PARTS_QUERY + (" AND part.car_id = :car_id" if car_id is not None else "")
+        rows = connection.execute(text(query), {'car_id': car_id}).all()
+        if not rows:
+            return []
+
+        parts = np.array(rows, dtype=np.float64)
+        part_ids = parts[:, 0].astype(np.int64)
+        remaining = np.clip(parts[:, 3], 0, None)
+
+        # Część bez wpisów w oknie nie ma tempa zużycia, więc nie ma też prognozy
+        day_rate = lookup(rate_ids, per_day, part_ids, 0.0)
+        event_rate = lookup(rate_ids, per_event, part_ids, np.nan)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days_left = np.where(day_rate > 0, np.ceil(remaining / day_rate), np.inf)
+            days_left = np.where(remaining == 0, 0, days_left)
+            events_left = np.where(event_rate > 0, remaining / event_rate, np.nan)
+
+        today = np.datetime64(date.today(), 'D')
+        finite = np.isfinite(days_left)
+        exhaustion = np.full(len(part_ids), np.datetime64('NaT'), dtype='datetime64[D]')
+        exhaustion[finite] = today + days_left[finite].astype('timedelta64[D]')
+
+        result = []
+        for i in np.lexsort((part_ids, exhaustion)):  # NaT (brak prognozy) na końcu
+            result.append({
+                'part_id': int(part_ids[i]),
+                'car_id': int(parts[i, 1]),
+                'mileage': int(parts[i, 2]),
+                'max_mileage': int(parts[i, 4]),
+                'remaining_mileage': int(parts[i, 3]),
+                'km_per_day': round(float(day_rate[i]), 2),
+                'km_per_event': round(float(event_rate[i]), 2) if np.isfinite(event_rate[i]) else None,
+                'days_left': int(days_left[i]) if finite[i] else None,
+                'events_left': round(float(events_left[i]), 1) if np.isfinite(events_left[i]) else None,
+                'exhaustion_date': str(exhaustion[i]) if finite[i] else None
+            })
+        return result
+
+    def cars(self, connection):
+        # Dla każdego samochodu najbliższa data wyczerpania części i liczba części z prognozą
+        cars = {}
+        for part in self.parts(connection):
+            car = cars.setdefault(part['car_id'], {
+                'car_id': part['car_id'],
+                'next_exhaustion_date': None,
+                'next_part_id': None,
+                'forecast_parts': 0
+            })
+            if part['exhaustion_date'] is None:
+                continue
+            car['forecast_parts'] += 1
+            if car['next_exhaustion_date'] is None:  # Części są posortowane po dacie wyczerpania
+                car['next_exhaustion_date'] = part['exhaustion_date']
+                car['next_part_id'] = part['part_id']
+        return sorted(cars.values(), key=lambda car: (car['next_exhaustion_date'] is None,
+                                                     car['next_exhaustion_date'] or '', car['car_id']))
+
+
+def plan_season(part_car, mileage, max_mileage, distances):
+    # Symulacja sezonu: part_car - wiersz samochodu w macierzy distances (samochody × wydarzenia, km).
+    # Część zużyta w trakcie wydarzenia jest wymieniana przed nim i nowa część startuje od zera.
+    # Zwraca (indeks części, indeks wydarzenia, przebieg wymienianej części) dla każdej wymiany.
+    if not len(part_car):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    part_car = np.asarray(part_car, dtype=np.int64)
+    distances = np.asarray(distances, dtype=np.float64)
+    cumulative = np.cumsum(distances, axis=1)
+    previous = cumulative - distances  # Przebieg samochodu przed danym wydarzeniem
+
+    part_cumulative = cumulative[part_car]  # części × wydarzenia
+    part_previous = previous[part_car]
+    drives = distances[part_car] > 0  # Część zmieniamy tylko na wydarzeniu, w którym auto jedzie
+    limit = np.asarray(max_mileage, dtype=np.float64)[:, None]
+    event_numbers = np.arange(distances.shape[1])
+
+    # Przebieg części po wydarzeniu k to cumulative[k] - base (base = przebieg auta przy montażu)
+    base = -np.asarray(mileage, dtype=np.float64)
+    start = np.zeros(len(base), dtype=np.int64)
+    active = np.arange(len(base))
+    replaced_parts, replaced_events, replaced_mileage = [], [], []
+
+    # Każdy obieg to kolejna generacja części - co najwyżej tyle obiegów, ile wydarzeń
+    while len(active):
+        over = (
+            (part_cumulative[active] - base[active, None] > limit[active])
+            & drives[active]
+            & (event_numbers >= start[active, None])
+        )
+        crossing = over.any(axis=1)
+        active = active[crossing]
+        first = over[crossing].argmax(axis=1)
+
+        replaced_parts.append(active)
+        replaced_events.append(first)
+        replaced_mileage.append(part_previous[active, first] - base[active])
+        base[active] = part_previous[active, first]
+        start[active] = first + 1
+
+    if not replaced_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(replaced_parts), np.concatenate(replaced_events), np.concatenate(replaced_mileage)
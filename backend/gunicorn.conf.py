@@ -0,0 +1,31 @@
+# Konfiguracja gunicorna dla ROCK64 (4 rdzenie ARM) za NGINX.
+# Liczby workerów i wątków można zmienić zmiennymi MSRT_WORKERS i MSRT_THREADS.
+import multiprocessing
+import os
+
+bind = os.environ.get('MSRT_BIND', '127.0.0.1:5000')  # NGINX przekazuje żądania lokalnie
+
+# Po jednym procesie na rdzeń - kodowanie JSON i Python wykonują się równolegle tylko w osobnych
+# procesach. Wątki obsługują żądania czekające na SQLite (zapisy kolejkują się na blokadzie bazy)
+# i otwarte strumienie /alerts/stream, z których każdy zajmuje wątek do rozłączenia klienta.
+workers = int(os.environ.get('MSRT_WORKERS', min(multiprocessing.cpu_count(), 4)))
+threads = int(os.environ.get('MSRT_THREADS', 4))
+worker_class = 'gthread'
+
+# Strumienie alertów na worker: połowa wątków (domyślnie 2 z 4, razem 8 kart przeglądarki na
+# 4 workerach); pozostałe wątki zawsze obsługują API. Kolejne strumienie dostają 503 z Retry-After
+# (po tym czasie klient może połączyć się ponownie). Nadpisanie: MSRT_ALERT_STREAM_LIMIT.
+os.environ.setdefault('MSRT_ALERT_STREAM_LIMIT', str(max(threads // 2, 1)))
+
+# Bez preload_app: każdy worker importuje aplikację sam i otwiera własne połączenia SQLite
+# (połączenia otwarte przed fork nie mogą być współdzielone przez procesy)
+preload_app = False
+
+timeout = 60  # Import CSV i eksport dużych tabel mogą trwać dłużej niż domyślne 30 s
+graceful_timeout = 10  # Strumienie SSE nie kończą się same - nie czekamy na nie przy restarcie
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('MSRT_LOG_LEVEL', 'info').lower()
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(M)sms "%(a)s"'
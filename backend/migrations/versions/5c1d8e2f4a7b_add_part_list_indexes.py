@@ -0,0 +1,30 @@
+"""Add indexes for the parts list
+
+Revision ID: 5c1d8e2f4a7b
+Revises: 2466ef58b9e2
+Create Date: 2026-10-18 10:12:41.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1d8e2f4a7b'
+down_revision = '2466ef58b9e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_part_car_id'), ['car_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_part_part_type_id'), ['part_type_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_part_name'), ['name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_part_name'))
+        batch_op.drop_index(batch_op.f('ix_part_part_type_id'))
+        batch_op.drop_index(batch_op.f('ix_part_car_id'))
@@ -0,0 +1,132 @@
+"""Add FTS5 search index
+
+Revision ID: 8e3a6f1b9c2d
+Revises: 5c1d8e2f4a7b
+Create Date: 2026-10-18 11:02:17.554120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3a6f1b9c2d'
+down_revision = '5c1d8e2f4a7b'
+branch_labels = None
+depends_on = None
+
+
+# DDL indeksu wyszukiwania w postaci z tej rewizji (search.py może się później zmieniać -
+# zmiany tabeli i triggerów trafiają do kolejnych migracji)
+CREATE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(kind UNINDEXED, ref_id UNINDEXED, "
+    "parent_id UNINDEXED, title, code, body, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+SEARCH_TRIGGERS = {
+    'search_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ai AFTER INSERT ON part BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_au AFTER UPDATE ON part BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ad AFTER DELETE ON part BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; END"
+    ),
+    'search_car_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_ai AFTER INSERT ON car BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 2, 'car', NEW.id, NULL, NEW.driver, NEW.chassis_number, NULL  "
+        "WHERE 1; END"
+    ),
+    'search_car_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_au AFTER UPDATE ON car BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 2, 'car', NEW.id, NULL, NEW.driver, NEW.chassis_number, NULL  "
+        "WHERE 1; END"
+    ),
+    'search_car_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_ad AFTER DELETE ON car BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2; END"
+    ),
+    'search_event_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_ai AFTER INSERT ON event BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 3, 'event', NEW.id, NULL, NEW.name, NULL, NEW.notes  WHERE 1; END"
+    ),
+    'search_event_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_au AFTER UPDATE ON event BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 3, 'event', NEW.id, NULL, NEW.name, NULL, NEW.notes  WHERE 1; END"
+    ),
+    'search_event_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_ad AFTER DELETE ON event BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3; END"
+    ),
+    'search_part_history_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_history_ai AFTER INSERT ON part_history BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 4, 'part_history', NEW.id, NEW.part_id, NEW.changed_field, NULL, "
+        "NEW.notes  WHERE NEW.notes IS NOT NULL AND NEW.notes <> ''; END"
+    ),
+    'search_part_history_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_history_au AFTER UPDATE ON part_history BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 4, 'part_history', NEW.id, NEW.part_id, NEW.changed_field, NULL, "
+        "NEW.notes  WHERE NEW.notes IS NOT NULL AND NEW.notes <> ''; END"
+    ),
+    'search_part_history_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_history_ad AFTER DELETE ON part_history BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4; END"
+    ),
+}
+
+REBUILD_SEARCH_INDEX = [
+    (
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT src.id * 8 + 1, 'part', src.id, NULL, src.name, src.part_number, src.notes "
+        "FROM part AS src WHERE 1"
+    ),
+    (
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT src.id * 8 + 2, 'car', src.id, NULL, src.driver, src.chassis_number, NULL "
+        "FROM car AS src WHERE 1"
+    ),
+    (
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT src.id * 8 + 3, 'event', src.id, NULL, src.name, NULL, src.notes FROM event AS src "
+        "WHERE 1"
+    ),
+    (
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT src.id * 8 + 4, 'part_history', src.id, src.part_id, src.changed_field, NULL, "
+        "src.notes FROM part_history AS src WHERE src.notes IS NOT NULL AND src.notes <> ''"
+    ),
+]
+
+
+def upgrade():
+    # Tabela FTS5, triggery synchronizujące i indeksacja istniejących danych
+    op.execute(CREATE_SEARCH_TABLE)
+    for statement in SEARCH_TRIGGERS.values():
+        op.execute(statement)
+    op.execute("DELETE FROM search_index")
+    for statement in REBUILD_SEARCH_INDEX:
+        op.execute(statement)
+
+
+def downgrade():
+    for name in SEARCH_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS search_index")
@@ -0,0 +1,68 @@
+"""Add mileage ledger
+
+Revision ID: a4d7e9c3b261
+Revises: f3c8a2d95b10
+Create Date: 2026-10-18 17:05:12.441803
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7e9c3b261'
+down_revision = 'f3c8a2d95b10'
+branch_labels = None
+depends_on = None
+
+
+# Wpisy przebiegu z historii (bieżącej i archiwum), których wartości są liczbami całkowitymi.
+# Auto bierzemy z obecnego przypisania części - historia nie zapisywała, na którym aucie była część.
+BACKFILL = """
+INSERT INTO mileage_ledger (part_id, car_id, event_id, delta, odometer, timestamp)
+SELECT h.part_id, part.car_id, NULL,
+       CAST(h.new_value AS INTEGER) - CAST(h.old_value AS INTEGER),
+       CAST(h.new_value AS INTEGER),
+       h.timestamp
+FROM {table} AS h
+JOIN part ON part.id = h.part_id
+WHERE h.changed_field = 'mileage'
+  AND h.timestamp IS NOT NULL
+  AND CAST(CAST(h.old_value AS INTEGER) AS TEXT) = h.old_value
+  AND CAST(CAST(h.new_value AS INTEGER) AS TEXT) = h.new_value
+ORDER BY h.timestamp, h.id
+"""
+
+
+def upgrade():
+    op.create_table('mileage_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('part_id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=True),
+    sa.Column('event_id', sa.Integer(), nullable=True),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.Column('odometer', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['car_id'], ['car.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['part_id'], ['part.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    for table in ('part_history_archive', 'part_history'):
+        op.execute(BACKFILL.format(table=table))
+
+    # Indeksy po wypełnieniu tabeli - szybciej niż aktualizowanie ich przy każdym wierszu
+    with op.batch_alter_table('mileage_ledger', schema=None) as batch_op:
+        batch_op.create_index('ix_mileage_ledger_part_id_timestamp', ['part_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_mileage_ledger_car_id_timestamp', ['car_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_mileage_ledger_event_id', ['event_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('mileage_ledger', schema=None) as batch_op:
+        batch_op.drop_index('ix_mileage_ledger_event_id')
+        batch_op.drop_index('ix_mileage_ledger_car_id_timestamp')
+        batch_op.drop_index('ix_mileage_ledger_part_id_timestamp')
+
+    op.drop_table('mileage_ledger')
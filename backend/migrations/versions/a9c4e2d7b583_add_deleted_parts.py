@@ -0,0 +1,88 @@
+"""Add deleted parts
+
+Revision ID: a9c4e2d7b583
+Revises: f5b2c7d1e839
+Create Date: 2026-10-18 23:41:52.208317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c4e2d7b583'
+down_revision = 'f5b2c7d1e839'
+branch_labels = None
+depends_on = None
+
+
+# Trigger zapisujący stan usuwanej części - kopia DELETED_PART_TRIGGER z deleted_parts.py z chwili migracji
+DELETED_PART_TRIGGER = (
+    "CREATE TRIGGER IF NOT EXISTS fleet_part_bd BEFORE DELETE ON part BEGIN "
+    "INSERT INTO deleted_part (part_id, name, part_number, part_type_id, car_id, mileage, created_at, deleted_at) "
+    "VALUES (OLD.id, OLD.name, OLD.part_number, OLD.part_type_id, OLD.car_id, OLD.mileage, OLD.created_at, "
+    "CURRENT_TIMESTAMP); "
+    "INSERT INTO deleted_part_change (deletion_id, changed_field, old_value, new_value, timestamp) "
+    "SELECT (SELECT max(id) FROM deleted_part), 'mileage', odometer - delta, odometer, timestamp "
+    "FROM mileage_ledger WHERE part_id = OLD.id; "
+    "INSERT INTO deleted_part_change (deletion_id, changed_field, old_value, new_value, timestamp) "
+    "SELECT (SELECT max(id) FROM deleted_part), changed_field, old_value, new_value, timestamp "
+    "FROM part_history WHERE part_id = OLD.id AND changed_field = 'car_id' AND timestamp IS NOT NULL "
+    "UNION ALL "
+    "SELECT (SELECT max(id) FROM deleted_part), changed_field, old_value, new_value, timestamp "
+    "FROM part_history_archive WHERE part_id = OLD.id AND changed_field = 'car_id' AND timestamp IS NOT NULL; "
+    "END"
+)
+
+
+def upgrade():
+    op.create_table('deleted_part',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('part_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('part_number', sa.String(length=100), nullable=False),
+    sa.Column('part_type_id', sa.Integer(), nullable=True),
+    sa.Column('car_id', sa.Integer(), nullable=True),
+    sa.Column('mileage', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('deleted_part', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_deleted_part_deleted_at'), ['deleted_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_deleted_part_part_id'), ['part_id'], unique=False)
+
+    op.create_table('deleted_part_change',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('deletion_id', sa.Integer(), nullable=False),
+    sa.Column('changed_field', sa.String(length=100), nullable=False),
+    sa.Column('old_value', sa.Text(), nullable=True),
+    sa.Column('new_value', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['deletion_id'], ['deleted_part.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('deleted_part_change', schema=None) as batch_op:
+        batch_op.create_index('ix_deleted_part_change_deletion_id_timestamp', ['deletion_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('change_tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_change_tombstone_kind_deleted_at', ['kind', 'deleted_at'], unique=False)
+
+    op.execute(DELETED_PART_TRIGGER)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS fleet_part_bd")
+
+    with op.batch_alter_table('change_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_tombstone_kind_deleted_at')
+
+    with op.batch_alter_table('deleted_part_change', schema=None) as batch_op:
+        batch_op.drop_index('ix_deleted_part_change_deletion_id_timestamp')
+
+    op.drop_table('deleted_part_change')
+    with op.batch_alter_table('deleted_part', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_deleted_part_part_id'))
+        batch_op.drop_index(batch_op.f('ix_deleted_part_deleted_at'))
+
+    op.drop_table('deleted_part')
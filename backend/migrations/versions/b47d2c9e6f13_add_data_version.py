@@ -0,0 +1,30 @@
+"""Add data version counter
+
+Revision ID: b47d2c9e6f13
+Revises: 8e3a6f1b9c2d
+Create Date: 2026-10-18 12:24:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47d2c9e6f13'
+down_revision = '8e3a6f1b9c2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, CURRENT_TIMESTAMP)")
+
+
+def downgrade():
+    op.drop_table('data_version')
@@ -0,0 +1,155 @@
+"""Add part remaining mileage
+
+Revision ID: c5e2b8f1d374
+Revises: a4d7e9c3b261
+Create Date: 2026-10-18 18:12:40.917265
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e2b8f1d374'
+down_revision = 'a4d7e9c3b261'
+branch_labels = None
+depends_on = None
+
+
+# DDL triggerów w postaci z tej rewizji (search.py i wear.py mogą się później zmieniać).
+# PREVIOUS_SEARCH_UPDATE_TRIGGERS i PART_SEARCH_TRIGGERS odtwarzają stan z rewizji 8e3a6f1b9c2d.
+SEARCH_UPDATE_TRIGGERS = {
+    'search_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_au AFTER UPDATE OF name, part_number, notes ON "
+        "part BEGIN DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_car_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_au AFTER UPDATE OF driver, chassis_number ON car "
+        "BEGIN DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 2, 'car', NEW.id, NULL, NEW.driver, NEW.chassis_number, NULL  "
+        "WHERE 1; END"
+    ),
+    'search_event_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_au AFTER UPDATE OF name, notes ON event BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 3, 'event', NEW.id, NULL, NEW.name, NULL, NEW.notes  WHERE 1; END"
+    ),
+    'search_part_history_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_history_au AFTER UPDATE OF part_id, "
+        "changed_field, notes ON part_history BEGIN DELETE FROM search_index "
+        "WHERE rowid = OLD.id * 8 + 4; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 4, 'part_history', NEW.id, NEW.part_id, NEW.changed_field, NULL, "
+        "NEW.notes  WHERE NEW.notes IS NOT NULL AND NEW.notes <> ''; END"
+    ),
+}
+
+PREVIOUS_SEARCH_UPDATE_TRIGGERS = {
+    'search_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_au AFTER UPDATE ON part BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_car_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_au AFTER UPDATE ON car BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 2, 'car', NEW.id, NULL, NEW.driver, NEW.chassis_number, NULL  "
+        "WHERE 1; END"
+    ),
+    'search_event_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_au AFTER UPDATE ON event BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 3, 'event', NEW.id, NULL, NEW.name, NULL, NEW.notes  WHERE 1; END"
+    ),
+    'search_part_history_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_history_au AFTER UPDATE ON part_history BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 4; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 4, 'part_history', NEW.id, NEW.part_id, NEW.changed_field, NULL, "
+        "NEW.notes  WHERE NEW.notes IS NOT NULL AND NEW.notes <> ''; END"
+    ),
+}
+
+PART_SEARCH_TRIGGERS = {
+    'search_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ai AFTER INSERT ON part BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ad AFTER DELETE ON part BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; END"
+    ),
+}
+
+WEAR_TRIGGERS = {
+    'wear_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_ai AFTER INSERT ON part BEGIN UPDATE part "
+        "SET remaining_mileage = (SELECT CASE "
+        "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - NEW.mileage END "
+        "FROM part_type WHERE part_type.id = NEW.part_type_id) WHERE id = NEW.id; END"
+    ),
+    'wear_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_au AFTER UPDATE OF mileage, part_type_id ON part "
+        "BEGIN UPDATE part SET remaining_mileage = (SELECT CASE "
+        "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - NEW.mileage END "
+        "FROM part_type WHERE part_type.id = NEW.part_type_id) WHERE id = NEW.id; END"
+    ),
+    'wear_part_type_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_type_au AFTER UPDATE OF max_mileage ON part_type "
+        "BEGIN UPDATE part SET remaining_mileage = CASE "
+        "WHEN NEW.max_mileage > 0 THEN NEW.max_mileage - mileage END WHERE part_type_id = NEW.id; "
+        "END"
+    ),
+}
+
+REFRESH_REMAINING_MILEAGE = (
+    "UPDATE part SET remaining_mileage = (SELECT CASE "
+    "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - part.mileage END FROM part_type "
+    "WHERE part_type.id = part.part_type_id)"
+)
+
+
+def upgrade():
+    # ALTER TABLE ADD COLUMN - tabela part nie jest przebudowywana, więc triggery wyszukiwarki zostają
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('remaining_mileage', sa.Integer(), nullable=True))
+
+    # Triggery UPDATE wyszukiwarki tylko dla kolumn indeksowanych - inaczej aktualizacja
+    # remaining_mileage w triggerze INSERT wstawiałaby drugi raz ten sam wpis indeksu
+    for name, statement in SEARCH_UPDATE_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(statement)
+    for statement in WEAR_TRIGGERS.values():
+        op.execute(statement)
+    op.execute(REFRESH_REMAINING_MILEAGE)
+
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_part_remaining_mileage'), ['remaining_mileage'], unique=False)
+
+
+def downgrade():
+    for name in WEAR_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_part_remaining_mileage'))
+        batch_op.drop_column('remaining_mileage')
+
+    # Usunięcie kolumny przebudowuje tabelę part, co kasuje jej triggery wyszukiwarki -
+    # odtwarzamy je, a triggery UPDATE pozostałych tabel wracają do poprzedniej postaci
+    for statement in PART_SEARCH_TRIGGERS.values():
+        op.execute(statement)
+    for name, statement in PREVIOUS_SEARCH_UPDATE_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(statement)
@@ -0,0 +1,125 @@
+"""Add fleet snapshots
+
+Revision ID: d81f3a6c2e95
+Revises: c5e2b8f1d374
+Create Date: 2026-10-18 19:48:03.662519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f3a6c2e95'
+down_revision = 'c5e2b8f1d374'
+branch_labels = None
+depends_on = None
+
+
+# Triggery tabeli part (wyszukiwarka i pozostały przebieg) w postaci z tej rewizji -
+# downgrade odtwarza je po przebudowie tabeli
+PART_SEARCH_TRIGGERS = {
+    'search_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ai AFTER INSERT ON part BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_au AFTER UPDATE OF name, part_number, notes ON "
+        "part BEGIN DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ad AFTER DELETE ON part BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; END"
+    ),
+}
+
+WEAR_TRIGGERS = {
+    'wear_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_ai AFTER INSERT ON part BEGIN UPDATE part "
+        "SET remaining_mileage = (SELECT CASE "
+        "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - NEW.mileage END "
+        "FROM part_type WHERE part_type.id = NEW.part_type_id) WHERE id = NEW.id; END"
+    ),
+    'wear_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_au AFTER UPDATE OF mileage, part_type_id ON part "
+        "BEGIN UPDATE part SET remaining_mileage = (SELECT CASE "
+        "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - NEW.mileage END "
+        "FROM part_type WHERE part_type.id = NEW.part_type_id) WHERE id = NEW.id; END"
+    ),
+    'wear_part_type_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_type_au AFTER UPDATE OF max_mileage ON part_type "
+        "BEGIN UPDATE part SET remaining_mileage = CASE "
+        "WHEN NEW.max_mileage > 0 THEN NEW.max_mileage - mileage END WHERE part_type_id = NEW.id; "
+        "END"
+    ),
+}
+
+
+def upgrade():
+    op.create_table('fleet_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(), nullable=False),
+    sa.Column('part_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('fleet_snapshot', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_fleet_snapshot_taken_at'), ['taken_at'], unique=False)
+
+    op.create_table('fleet_snapshot_part',
+    sa.Column('snapshot_id', sa.Integer(), nullable=False),
+    sa.Column('part_id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=True),
+    sa.Column('mileage', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('part_number', sa.String(length=100), nullable=False),
+    sa.Column('part_type_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['snapshot_id'], ['fleet_snapshot.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('snapshot_id', 'part_id')
+    )
+
+    # Istniejące części dostają NULL (data dodania nieznana) - ALTER TABLE nie przebudowuje tabeli
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('mileage_ledger', schema=None) as batch_op:
+        batch_op.create_index('ix_mileage_ledger_timestamp', ['timestamp'], unique=False)
+
+    with op.batch_alter_table('part_history', schema=None) as batch_op:
+        batch_op.create_index('ix_part_history_changed_field_timestamp', ['changed_field', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('part_history_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_part_history_archive_changed_field_timestamp', ['changed_field', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('part_history_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_part_history_archive_changed_field_timestamp')
+
+    with op.batch_alter_table('part_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_part_history_changed_field_timestamp')
+
+    with op.batch_alter_table('mileage_ledger', schema=None) as batch_op:
+        batch_op.drop_index('ix_mileage_ledger_timestamp')
+
+    # Usunięcie kolumny przebudowuje tabelę part, co kasuje jej triggery; trigger na part_type
+    # odwołuje się do part, więc musi zniknąć przed przebudową
+    for name in WEAR_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    with op.batch_alter_table('part', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
+
+    for statement in PART_SEARCH_TRIGGERS.values():
+        op.execute(statement)
+    for statement in WEAR_TRIGGERS.values():
+        op.execute(statement)
+
+    op.drop_table('fleet_snapshot_part')
+    with op.batch_alter_table('fleet_snapshot', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_fleet_snapshot_taken_at'))
+
+    op.drop_table('fleet_snapshot')
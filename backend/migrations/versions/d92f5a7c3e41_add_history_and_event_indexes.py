@@ -0,0 +1,32 @@
+"""Add indexes for car history and event assignments
+
+Revision ID: d92f5a7c3e41
+Revises: b47d2c9e6f13
+Create Date: 2026-10-18 13:40:52.671209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd92f5a7c3e41'
+down_revision = 'b47d2c9e6f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('car_history', schema=None) as batch_op:
+        batch_op.create_index('ix_car_history_car_id_timestamp', ['car_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('car_event', schema=None) as batch_op:
+        batch_op.create_index('ix_car_event_event_id', ['event_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('car_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_car_event_event_id')
+
+    with op.batch_alter_table('car_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_car_history_car_id_timestamp')
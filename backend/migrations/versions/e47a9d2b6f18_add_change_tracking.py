@@ -0,0 +1,228 @@
+"""Add change tracking
+
+Revision ID: e47a9d2b6f18
+Revises: d81f3a6c2e95
+Create Date: 2026-10-18 21:03:55.284190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e47a9d2b6f18'
+down_revision = 'd81f3a6c2e95'
+branch_labels = None
+depends_on = None
+
+
+# DDL w postaci z tej rewizji (changes.py, search.py i wear.py mogą się później zmieniać).
+# SEARCH_TRIGGERS i WEAR_TRIGGERS to triggery przebudowywanych tabel, odtwarzane w downgrade.
+CHANGE_TABLES = ('car', 'part', 'part_type', 'event', 'car_event')
+
+CHANGE_TRIGGERS = {
+    'change_car_ai': (
+        "CREATE TRIGGER IF NOT EXISTS change_car_ai AFTER INSERT ON car BEGIN UPDATE car "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_car_au': (
+        "CREATE TRIGGER IF NOT EXISTS change_car_au AFTER UPDATE ON car "
+        "WHEN NEW.change_version IS OLD.change_version BEGIN UPDATE car "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_car_ad': (
+        "CREATE TRIGGER IF NOT EXISTS change_car_ad AFTER DELETE ON car BEGIN "
+        "INSERT INTO change_tombstone(kind, ref_id, ref_id2, change_version, deleted_at) VALUES "
+        "('cars', OLD.id, NULL, (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version), CURRENT_TIMESTAMP); END"
+    ),
+    'change_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS change_part_ai AFTER INSERT ON part BEGIN UPDATE part "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS change_part_au AFTER UPDATE ON part "
+        "WHEN NEW.change_version IS OLD.change_version BEGIN UPDATE part "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_part_ad': (
+        "CREATE TRIGGER IF NOT EXISTS change_part_ad AFTER DELETE ON part BEGIN "
+        "INSERT INTO change_tombstone(kind, ref_id, ref_id2, change_version, deleted_at) VALUES "
+        "('parts', OLD.id, NULL, (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version), CURRENT_TIMESTAMP); END"
+    ),
+    'change_part_type_ai': (
+        "CREATE TRIGGER IF NOT EXISTS change_part_type_ai AFTER INSERT ON part_type BEGIN "
+        "UPDATE part_type SET change_version = (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version) WHERE rowid = NEW.rowid; END"
+    ),
+    'change_part_type_au': (
+        "CREATE TRIGGER IF NOT EXISTS change_part_type_au AFTER UPDATE ON part_type "
+        "WHEN NEW.change_version IS OLD.change_version BEGIN UPDATE part_type "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_part_type_ad': (
+        "CREATE TRIGGER IF NOT EXISTS change_part_type_ad AFTER DELETE ON part_type BEGIN "
+        "INSERT INTO change_tombstone(kind, ref_id, ref_id2, change_version, deleted_at) VALUES "
+        "('part_types', OLD.id, NULL, (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version), CURRENT_TIMESTAMP); END"
+    ),
+    'change_event_ai': (
+        "CREATE TRIGGER IF NOT EXISTS change_event_ai AFTER INSERT ON event BEGIN UPDATE event "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_event_au': (
+        "CREATE TRIGGER IF NOT EXISTS change_event_au AFTER UPDATE ON event "
+        "WHEN NEW.change_version IS OLD.change_version BEGIN UPDATE event "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_event_ad': (
+        "CREATE TRIGGER IF NOT EXISTS change_event_ad AFTER DELETE ON event BEGIN "
+        "INSERT INTO change_tombstone(kind, ref_id, ref_id2, change_version, deleted_at) VALUES "
+        "('events', OLD.id, NULL, (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version), CURRENT_TIMESTAMP); END"
+    ),
+    'change_car_event_ai': (
+        "CREATE TRIGGER IF NOT EXISTS change_car_event_ai AFTER INSERT ON car_event BEGIN "
+        "UPDATE car_event SET change_version = (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version) WHERE rowid = NEW.rowid; END"
+    ),
+    'change_car_event_au': (
+        "CREATE TRIGGER IF NOT EXISTS change_car_event_au AFTER UPDATE ON car_event "
+        "WHEN NEW.change_version IS OLD.change_version BEGIN UPDATE car_event "
+        "SET change_version = (SELECT coalesce(max(version), 0) + 1 FROM data_version) "
+        "WHERE rowid = NEW.rowid; END"
+    ),
+    'change_car_event_ad': (
+        "CREATE TRIGGER IF NOT EXISTS change_car_event_ad AFTER DELETE ON car_event BEGIN "
+        "INSERT INTO change_tombstone(kind, ref_id, ref_id2, change_version, deleted_at) VALUES "
+        "('assignments', OLD.car_id, OLD.event_id, (SELECT coalesce(max(version), 0) + 1 "
+        "FROM data_version), CURRENT_TIMESTAMP); END"
+    ),
+}
+
+SEARCH_TRIGGERS = {
+    'search_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ai AFTER INSERT ON part BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_au AFTER UPDATE OF name, part_number, notes ON "
+        "part BEGIN DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 1, 'part', NEW.id, NULL, NEW.name, NEW.part_number, NEW.notes  "
+        "WHERE 1; END"
+    ),
+    'search_part_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_part_ad AFTER DELETE ON part BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 1; END"
+    ),
+    'search_car_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_ai AFTER INSERT ON car BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 2, 'car', NEW.id, NULL, NEW.driver, NEW.chassis_number, NULL  "
+        "WHERE 1; END"
+    ),
+    'search_car_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_au AFTER UPDATE OF driver, chassis_number ON car "
+        "BEGIN DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 2, 'car', NEW.id, NULL, NEW.driver, NEW.chassis_number, NULL  "
+        "WHERE 1; END"
+    ),
+    'search_car_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_car_ad AFTER DELETE ON car BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 2; END"
+    ),
+    'search_event_ai': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_ai AFTER INSERT ON event BEGIN "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 3, 'event', NEW.id, NULL, NEW.name, NULL, NEW.notes  WHERE 1; END"
+    ),
+    'search_event_au': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_au AFTER UPDATE OF name, notes ON event BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3; "
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        "SELECT NEW.id * 8 + 3, 'event', NEW.id, NULL, NEW.name, NULL, NEW.notes  WHERE 1; END"
+    ),
+    'search_event_ad': (
+        "CREATE TRIGGER IF NOT EXISTS search_event_ad AFTER DELETE ON event BEGIN "
+        "DELETE FROM search_index WHERE rowid = OLD.id * 8 + 3; END"
+    ),
+}
+
+WEAR_TRIGGERS = {
+    'wear_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_ai AFTER INSERT ON part BEGIN UPDATE part "
+        "SET remaining_mileage = (SELECT CASE "
+        "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - NEW.mileage END "
+        "FROM part_type WHERE part_type.id = NEW.part_type_id) WHERE id = NEW.id; END"
+    ),
+    'wear_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_au AFTER UPDATE OF mileage, part_type_id ON part "
+        "BEGIN UPDATE part SET remaining_mileage = (SELECT CASE "
+        "WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - NEW.mileage END "
+        "FROM part_type WHERE part_type.id = NEW.part_type_id) WHERE id = NEW.id; END"
+    ),
+    'wear_part_type_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_type_au AFTER UPDATE OF max_mileage ON part_type "
+        "BEGIN UPDATE part SET remaining_mileage = CASE "
+        "WHEN NEW.max_mileage > 0 THEN NEW.max_mileage - mileage END WHERE part_type_id = NEW.id; "
+        "END"
+    ),
+}
+
+
+def upgrade():
+    op.create_table('change_tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('ref_id2', sa.Integer(), nullable=True),
+    sa.Column('change_version', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('change_tombstone', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_change_tombstone_change_version'), ['change_version'], unique=False)
+
+    # Istniejące wiersze dostają bieżącą wersję danych - pojawią się w pełnej synchronizacji
+    for table in CHANGE_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('change_version', sa.Integer(), nullable=True))
+        op.execute(f"UPDATE {table} SET change_version = (SELECT coalesce(max(version), 0) FROM data_version)")
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(f'ix_{table}_change_version', ['change_version'], unique=False)
+
+    for statement in CHANGE_TRIGGERS.values():
+        op.execute(statement)
+
+
+def downgrade():
+    for name in list(CHANGE_TRIGGERS) + list(WEAR_TRIGGERS):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    # Usunięcie kolumn przebudowuje tabele, co kasuje ich triggery - odtwarzamy pozostałe
+    for table in CHANGE_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_change_version')
+            batch_op.drop_column('change_version')
+
+    for statement in SEARCH_TRIGGERS.values():
+        op.execute(statement)
+    for statement in WEAR_TRIGGERS.values():
+        op.execute(statement)
+
+    with op.batch_alter_table('change_tombstone', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_change_tombstone_change_version'))
+
+    op.drop_table('change_tombstone')
@@ -0,0 +1,29 @@
+"""Index part history by part and timestamp
+
+Revision ID: e6b1f04a8d27
+Revises: d92f5a7c3e41
+Create Date: 2026-10-18 14:31:09.402876
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b1f04a8d27'
+down_revision = 'd92f5a7c3e41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Indeks złożony zastępuje indeks po samym part_id (obsługuje też wyszukiwanie po części)
+    with op.batch_alter_table('part_history', schema=None) as batch_op:
+        batch_op.create_index('ix_part_history_part_id_timestamp', ['part_id', 'timestamp'], unique=False)
+        batch_op.drop_index('ix_part_history_part_id')
+
+
+def downgrade():
+    with op.batch_alter_table('part_history', schema=None) as batch_op:
+        batch_op.create_index('ix_part_history_part_id', ['part_id'], unique=False)
+        batch_op.drop_index('ix_part_history_part_id_timestamp')
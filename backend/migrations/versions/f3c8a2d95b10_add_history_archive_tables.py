@@ -0,0 +1,56 @@
+"""Add history archive tables
+
+Revision ID: f3c8a2d95b10
+Revises: e6b1f04a8d27
+Create Date: 2026-10-18 15:20:44.018735
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a2d95b10'
+down_revision = 'e6b1f04a8d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('part_history_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('part_id', sa.Integer(), nullable=True),
+    sa.Column('changed_field', sa.String(length=100), nullable=False),
+    sa.Column('old_value', sa.Text(), nullable=True),
+    sa.Column('new_value', sa.Text(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['part_id'], ['part.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('part_history_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_part_history_archive_part_id_timestamp', ['part_id', 'timestamp'], unique=False)
+
+    op.create_table('car_history_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('changed_field', sa.String(length=50), nullable=False),
+    sa.Column('old_value', sa.String(length=255), nullable=True),
+    sa.Column('new_value', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['car_id'], ['car.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('car_history_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_car_history_archive_car_id_timestamp', ['car_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('car_history_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_car_history_archive_car_id_timestamp')
+
+    op.drop_table('car_history_archive')
+    with op.batch_alter_table('part_history_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_part_history_archive_part_id_timestamp')
+
+    op.drop_table('part_history_archive')
@@ -0,0 +1,44 @@
+"""Add wear alerts
+
+Revision ID: f5b2c7d1e839
+Revises: e47a9d2b6f18
+Create Date: 2026-10-18 22:14:07.531962
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b2c7d1e839'
+down_revision = 'e47a9d2b6f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('wear_alert',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('part_id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=True),
+    sa.Column('level', sa.Integer(), nullable=False),
+    sa.Column('mileage', sa.Integer(), nullable=False),
+    sa.Column('max_mileage', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('acknowledged_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['part_id'], ['part.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('wear_alert', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_wear_alert_acknowledged_at'), ['acknowledged_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_wear_alert_car_id'), ['car_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_wear_alert_part_id'), ['part_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('wear_alert', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_wear_alert_part_id'))
+        batch_op.drop_index(batch_op.f('ix_wear_alert_car_id'))
+        batch_op.drop_index(batch_op.f('ix_wear_alert_acknowledged_at'))
+
+    op.drop_table('wear_alert')
@@ -0,0 +1,168 @@
+# Silnik przebiegu - operacje zbiorowe w SQL zamiast modyfikowania obiektów ORM po kolei.
+# Przyrosty liczone są w bazie (mileage = mileage + ?), więc równoległe zgłoszenia
+# nie nadpisują sobie nawzajem wartości. Zatwierdzenie transakcji należy do wywołującego.
+from flask import current_app
+
+from extensions import db
+from models import MileageEntry, Part, PartHistory, PartType, WearAlert
+
+
+part_table = Part.__table__
+part_history_table = PartHistory.__table__
+mileage_ledger_table = MileageEntry.__table__
+MILEAGE_HISTORY_COLUMNS = ['part_id', 'changed_field', 'old_value', 'new_value', 'timestamp', 'notes']
+MILEAGE_LEDGER_COLUMNS = ['part_id', 'car_id', 'event_id', 'delta', 'odometer', 'timestamp']
+WEAR_ALERT_CHUNK_SIZE = 500
+
+
+def record_wear_alerts(changes, timestamp):
+    # changes: {part_id: (stary przebieg, nowy przebieg)} - tylko części zmienione w tej transakcji.
+    # Alert powstaje, gdy przebieg przeszedł przez próg z WEAR_ALERT_LEVELS (od dołu do góry).
+    rising = {part_id: values for part_id, values in changes.items() if values[1] > values[0]}
+    part_ids = list(rising)
+    alerts = []
+    for start in range(0, len(part_ids), WEAR_ALERT_CHUNK_SIZE):
+        rows = db.session.execute(
+            db.select(Part.id, Part.car_id, PartType.max_mileage)
+            .join(PartType, Part.part_type_id == PartType.id)
+            .where(Part.id.in_(part_ids[start:start + WEAR_ALERT_CHUNK_SIZE]), PartType.max_mileage > 0)
+        )
+        for row in rows:
+            old, new = rising[row.id]
+            for level in current_app.config['WEAR_ALERT_LEVELS']:
+                if old * 100 < row.max_mileage * level <= new * 100:
+                    alerts.append({
+                        'part_id': row.id,
+                        'car_id': row.car_id,
+                        'level': level,
+                        'mileage': new,
+                        'max_mileage': row.max_mileage,
+                        'created_at': timestamp
+                    })
+    if alerts:
+        db.session.execute(db.insert(WearAlert.__table__), alerts)
+        db.session.info['wear_alerts'] = True  # Strumienie SSE budzimy dopiero po zatwierdzeniu
+    return len(alerts)
+
+
+def select_updated_parts(condition):
+    return db.session.execute(
+        db.select(part_table.c.id, part_table.c.car_id, part_table.c.name, part_table.c.mileage)
+        .where(condition)
+        .order_by(part_table.c.id)
+    ).mappings().all()
+
+
+def set_car_mileage(car_id, mileage, notes, timestamp):
+    # Najpierw historia (INSERT ... SELECT blokuje bazę do zapisu), potem aktualizacja przebiegu
+    db.session.execute(
+        db.insert(part_history_table).from_select(
+            MILEAGE_HISTORY_COLUMNS,
+            db.select(
+                part_table.c.id,
+                db.literal('mileage'),
+                db.cast(part_table.c.mileage, db.Text),
+                db.literal(str(mileage)),
+                db.literal(timestamp, db.DateTime),
+                db.literal(notes)
+            ).where(part_table.c.car_id == car_id)
+        )
+    )
+    db.session.execute(
+        db.insert(mileage_ledger_table).from_select(
+            MILEAGE_LEDGER_COLUMNS,
+            db.select(
+                part_table.c.id,
+                part_table.c.car_id,
+                db.literal(None, db.Integer),
+                db.literal(mileage) - part_table.c.mileage,
+                db.literal(mileage),
+                db.literal(timestamp, db.DateTime)
+            ).where(part_table.c.car_id == car_id)
+        )
+    )
+    previous = dict(db.session.execute(
+        db.select(part_table.c.id, part_table.c.mileage).where(part_table.c.car_id == car_id)
+    ).all())
+    db.session.execute(
+        db.update(part_table).where(part_table.c.car_id == car_id).values(mileage=mileage)
+    )
+    record_wear_alerts({part_id: (old, mileage) for part_id, old in previous.items()}, timestamp)
+    return select_updated_parts(part_table.c.car_id == car_id)
+
+
+def add_parts_mileage(car_id, deltas, notes, timestamp):
+    # deltas: {part_id: przyrost}; jedno executemany dla przyrostów i jedno dla historii
+    db.session.execute(
+        db.update(part_table)
+        .where(part_table.c.id == db.bindparam('b_part_id'), part_table.c.car_id == car_id)
+        .values(mileage=part_table.c.mileage + db.bindparam('b_delta')),
+        [{'b_part_id': part_id, 'b_delta': delta} for part_id, delta in deltas.items()]
+    )
+    updated = select_updated_parts(
+        db.and_(part_table.c.id.in_(list(deltas)), part_table.c.car_id == car_id)
+    )
+    if updated:
+        db.session.execute(db.insert(part_history_table), [{
+            'part_id': part['id'],
+            'changed_field': 'mileage',
+            'old_value': str(part['mileage'] - deltas[part['id']]),
+            'new_value': str(part['mileage']),
+            'timestamp': timestamp,
+            'notes': notes
+        } for part in updated])
+        db.session.execute(db.insert(mileage_ledger_table), [{
+            'part_id': part['id'],
+            'car_id': part['car_id'],
+            'delta': deltas[part['id']],
+            'odometer': part['mileage'],
+            'timestamp': timestamp
+        } for part in updated])
+        record_wear_alerts(
+            {part['id']: (part['mileage'] - deltas[part['id']], part['mileage']) for part in updated}, timestamp
+        )
+    return updated
+
+
+def add_cars_mileage(deltas, notes, timestamp, event_id=None):
+    # deltas: {car_id: przyrost}; przebieg dodawany do wszystkich części każdego samochodu
+    params = [{'b_car_id': car_id, 'b_delta': delta} for car_id, delta in deltas.items()]
+    db.session.execute(
+        db.update(part_table)
+        .where(part_table.c.car_id == db.bindparam('b_car_id'))
+        .values(mileage=part_table.c.mileage + db.bindparam('b_delta')),
+        params
+    )
+    db.session.execute(
+        db.insert(part_history_table).from_select(
+            MILEAGE_HISTORY_COLUMNS,
+            db.select(
+                part_table.c.id,
+                db.literal('mileage'),
+                db.cast(part_table.c.mileage - db.bindparam('b_delta'), db.Text),
+                db.cast(part_table.c.mileage, db.Text),
+                db.literal(timestamp, db.DateTime),
+                db.literal(notes)
+            ).where(part_table.c.car_id == db.bindparam('b_car_id'))
+        ),
+        params
+    )
+    db.session.execute(
+        db.insert(mileage_ledger_table).from_select(
+            MILEAGE_LEDGER_COLUMNS,
+            db.select(
+                part_table.c.id,
+                part_table.c.car_id,
+                db.literal(event_id, db.Integer),
+                db.bindparam('b_delta', type_=db.Integer),
+                part_table.c.mileage,
+                db.literal(timestamp, db.DateTime)
+            ).where(part_table.c.car_id == db.bindparam('b_car_id'))
+        ),
+        params
+    )
+    updated = select_updated_parts(part_table.c.car_id.in_(list(deltas)))
+    record_wear_alerts(
+        {part['id']: (part['mileage'] - deltas[part['car_id']], part['mileage']) for part in updated}, timestamp
+    )
+    return updated
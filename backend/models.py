@@ -0,0 +1,312 @@
+# Modele bazy danych oraz zdarzenia sesji utrzymujące globalną wersję danych
+# (ETag, pamięć podręczna odczytów, kanał zmian) i powiadamiające strumienie alertów.
+from datetime import date, datetime
+
+from flask import g, has_app_context
+
+from extensions import alert_broadcaster, db, read_cache
+
+
+#Definicja car
+class Car(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    chassis_number = db.Column(db.String(3), unique=True, nullable=False)
+    driver = db.Column(db.String(100), nullable=False)
+    change_version = db.Column(db.Integer, nullable=True, index=True)  # Wersja danych ostatniej zmiany (changes.py)
+    parts = db.relationship('Part', backref='car', lazy=True, cascade="all, delete-orphan")
+    events = db.relationship('Event', secondary='car_event', back_populates='cars')
+
+def __repr__(self):
+    return f"<Car {self.chassis_number}, Driver: {self.driver}>"
+
+
+class Part(db.Model):
+    __tablename__ = "part"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    mileage = db.Column(db.Integer, nullable=False)
+    part_number = db.Column(db.String(100), unique=True, nullable=False)
+    notes = db.Column(db.Text, nullable=True)
+    car_id = db.Column(db.Integer, db.ForeignKey("car.id", ondelete="CASCADE"), nullable=False, index=True)
+    part_type_id = db.Column(db.Integer, db.ForeignKey("part_type.id", ondelete="CASCADE"), nullable=False, index=True)
+    # max_mileage typu minus przebieg; wyliczane przez triggery z wear.py (NULL bez limitu)
+    remaining_mileage = db.Column(db.Integer, nullable=True, index=True)
+    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)  # NULL - część sprzed tej kolumny
+    change_version = db.Column(db.Integer, nullable=True, index=True)
+
+    # Relacja z historią zmian części
+    history = db.relationship(
+        "PartHistory",
+        back_populates="part",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="dynamic"  # Dzięki temu możemy robić np. part.history.filter(...)
+    )
+
+    def __repr__(self):
+        return f"<Part {self.name} (Number: {self.part_number})>"
+
+
+class PartType(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    max_mileage = db.Column(db.Integer, nullable=True)
+    change_version = db.Column(db.Integer, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<PartType {self.name}>"
+    
+class Event(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)
+    date = db.Column(db.Date, nullable=False, default=date.today)  # Automatycznie ustawi dzisiejszą datę
+    notes = db.Column(db.Text, nullable=True)
+    change_version = db.Column(db.Integer, nullable=True, index=True)
+    cars = db.relationship('Car', secondary='car_event', back_populates='events')
+
+def __repr__(self):
+    return f"<Event {self.name} ({self.date})>"
+
+
+car_event = db.Table(
+    'car_event',
+    db.Column('car_id', db.Integer, db.ForeignKey('car.id'), primary_key=True),
+    db.Column('event_id', db.Integer, db.ForeignKey('event.id'), primary_key=True),
+    db.Column('change_version', db.Integer, nullable=True),
+    db.Index('ix_car_event_event_id', 'event_id'),  # Samochody danego wydarzenia
+    db.Index('ix_car_event_change_version', 'change_version')
+)
+
+class PartHistory(db.Model):
+    __tablename__ = "part_history"
+    __table_args__ = (
+        db.Index('ix_part_history_part_id_timestamp', 'part_id', 'timestamp'),  # Historia części posortowana po czasie
+        db.Index('ix_part_history_changed_field_timestamp', 'changed_field', 'timestamp'),  # Np. przeniesienia części w okresie
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey("part.id", ondelete="CASCADE"))
+    changed_field = db.Column(db.String(100), nullable=False)
+    old_value = db.Column(db.Text, nullable=True)
+    new_value = db.Column(db.Text, nullable=True)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    notes = db.Column(db.Text, nullable=True)
+
+    part = db.relationship("Part", back_populates="history")
+
+    def __repr__(self):
+        return f"<PartHistory part_id={self.part_id}, field={self.changed_field}, timestamp={self.timestamp}>"
+    
+class CarHistory(db.Model):
+    __table_args__ = (
+        db.Index('ix_car_history_car_id_timestamp', 'car_id', 'timestamp'),  # Historia auta posortowana po czasie
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    car_id = db.Column(db.Integer, db.ForeignKey('car.id'), nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    changed_field = db.Column(db.String(50), nullable=False)
+    old_value = db.Column(db.String(255))
+    new_value = db.Column(db.String(255))
+
+    car = db.relationship('Car', backref=db.backref('history', lazy=True))
+
+
+# Archiwum historii - wpisy starsze niż HISTORY_ARCHIVE_AFTER_DAYS przenoszone z tabel bieżących
+# (z zachowaniem ID, więc stronicowanie po (timestamp, id) działa na obu tabelach naraz)
+class PartHistoryArchive(db.Model):
+    __tablename__ = "part_history_archive"
+    __table_args__ = (
+        db.Index('ix_part_history_archive_part_id_timestamp', 'part_id', 'timestamp'),
+        db.Index('ix_part_history_archive_changed_field_timestamp', 'changed_field', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey("part.id", ondelete="CASCADE"))
+    changed_field = db.Column(db.String(100), nullable=False)
+    old_value = db.Column(db.Text, nullable=True)
+    new_value = db.Column(db.Text, nullable=True)
+    timestamp = db.Column(db.DateTime)
+    notes = db.Column(db.Text, nullable=True)
+
+
+class CarHistoryArchive(db.Model):
+    __tablename__ = "car_history_archive"
+    __table_args__ = (
+        db.Index('ix_car_history_archive_car_id_timestamp', 'car_id', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    car_id = db.Column(db.Integer, db.ForeignKey('car.id'), nullable=False)
+    timestamp = db.Column(db.DateTime)
+    changed_field = db.Column(db.String(50), nullable=False)
+    old_value = db.Column(db.String(255))
+    new_value = db.Column(db.String(255))
+
+
+# Rejestr przebiegu - każda zmiana przebiegu części jako liczby całkowite (przyrost i stan licznika),
+# dzięki czemu sumy przebiegu w okresie, na auto czy na wydarzenie liczy SQL (SUM/GROUP BY po indeksie)
+class MileageEntry(db.Model):
+    __tablename__ = "mileage_ledger"
+    __table_args__ = (
+        db.Index('ix_mileage_ledger_part_id_timestamp', 'part_id', 'timestamp'),
+        db.Index('ix_mileage_ledger_car_id_timestamp', 'car_id', 'timestamp'),
+        db.Index('ix_mileage_ledger_event_id', 'event_id'),
+        db.Index('ix_mileage_ledger_timestamp', 'timestamp'),  # Zmiany przebiegu całej floty w okresie
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey("part.id", ondelete="CASCADE"), nullable=False)
+    car_id = db.Column(db.Integer, db.ForeignKey("car.id", ondelete="SET NULL"), nullable=True)  # Usunięcie auta nie usuwa przebiegu jego części
+    event_id = db.Column(db.Integer, db.ForeignKey("event.id", ondelete="SET NULL"), nullable=True)
+    delta = db.Column(db.Integer, nullable=False)
+    odometer = db.Column(db.Integer, nullable=False)  # Przebieg części po zmianie
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Punkty kontrolne stanu floty: przypisanie i przebieg wszystkich części w chwili taken_at.
+# Stan na dowolną chwilę odtwarzamy od najbliższego wcześniejszego punktu, dokładając tylko późniejsze zmiany.
+class FleetSnapshot(db.Model):
+    __tablename__ = "fleet_snapshot"
+
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    part_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class FleetSnapshotPart(db.Model):
+    __tablename__ = "fleet_snapshot_part"
+
+    snapshot_id = db.Column(db.Integer, db.ForeignKey("fleet_snapshot.id", ondelete="CASCADE"), primary_key=True)
+    part_id = db.Column(db.Integer, primary_key=True)  # Bez klucza obcego - punkt pamięta też usunięte części
+    car_id = db.Column(db.Integer, nullable=True)
+    mileage = db.Column(db.Integer, nullable=True)
+    name = db.Column(db.String(100), nullable=False)
+    part_number = db.Column(db.String(100), nullable=False)
+    part_type_id = db.Column(db.Integer, nullable=True)
+
+
+# Usunięte części - ostatni stan i zmiany przebiegu/przeniesienia skopiowane przez trigger z deleted_parts.py
+# przed kaskadowym usunięciem; /as-of odtwarza z nich części usunięte po wybranej chwili
+class DeletedPart(db.Model):
+    __tablename__ = "deleted_part"
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_id = db.Column(db.Integer, nullable=False, index=True)  # Bez klucza obcego - części już nie ma
+    name = db.Column(db.String(100), nullable=False)
+    part_number = db.Column(db.String(100), nullable=False)
+    part_type_id = db.Column(db.Integer, nullable=True)
+    car_id = db.Column(db.Integer, nullable=True)
+    mileage = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class DeletedPartChange(db.Model):
+    __tablename__ = "deleted_part_change"
+    __table_args__ = (
+        db.Index('ix_deleted_part_change_deletion_id_timestamp', 'deletion_id', 'timestamp'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    deletion_id = db.Column(db.Integer, db.ForeignKey("deleted_part.id", ondelete="CASCADE"), nullable=False)
+    changed_field = db.Column(db.String(100), nullable=False)  # 'mileage' albo 'car_id'
+    old_value = db.Column(db.Text, nullable=True)
+    new_value = db.Column(db.Text, nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=False)
+
+
+# Alert zużycia: przebieg części przekroczył próg (procent max_mileage typu części)
+class WearAlert(db.Model):
+    __tablename__ = "wear_alert"
+
+    id = db.Column(db.Integer, primary_key=True)
+    part_id = db.Column(db.Integer, db.ForeignKey("part.id", ondelete="CASCADE"), nullable=False, index=True)
+    car_id = db.Column(db.Integer, nullable=True, index=True)
+    level = db.Column(db.Integer, nullable=False)  # Przekroczony próg w procentach
+    mileage = db.Column(db.Integer, nullable=False)
+    max_mileage = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    acknowledged_at = db.Column(db.DateTime, nullable=True, index=True)
+
+
+# Nagrobki usuniętych wierszy dla /changes (rodzaj z changes.CHANGE_SOURCES i klucz wiersza)
+class ChangeTombstone(db.Model):
+    __tablename__ = "change_tombstone"
+    __table_args__ = (
+        db.Index('ix_change_tombstone_kind_deleted_at', 'kind', 'deleted_at'),  # Usunięcia w okresie (/as-of)
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    ref_id = db.Column(db.Integer, nullable=False)
+    ref_id2 = db.Column(db.Integer, nullable=True)  # event_id przypisania auta do wydarzenia
+    change_version = db.Column(db.Integer, nullable=False, index=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Globalny numer wersji danych - zwiększany przy każdym zatwierdzonym zapisie
+class DataVersion(db.Model):
+    __tablename__ = "data_version"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+# Zapis wykryty w sesji (flush obiektów ORM albo INSERT/UPDATE/DELETE wykonany przez session.execute)
+@db.event.listens_for(db.session, 'do_orm_execute')
+def mark_data_changed_on_execute(execute_state):
+    if execute_state.is_insert or execute_state.is_update or execute_state.is_delete:
+        execute_state.session.info['data_changed'] = True
+
+
+@db.event.listens_for(db.session, 'after_flush')
+def mark_data_changed_on_flush(session, flush_context):
+    session.info['data_changed'] = True
+
+
+# Podbicie wersji w tej samej transakcji co zapis, więc wersja nigdy nie wyprzedza danych
+@db.event.listens_for(db.session, 'before_commit')
+def bump_data_version(session):
+    session.flush()
+    if not session.info.pop('data_changed', False):
+        return
+    table = DataVersion.__table__
+    now = datetime.utcnow()
+    result = session.execute(
+        db.update(table).where(table.c.id == 1).values(version=table.c.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        session.execute(db.insert(table).values(id=1, version=1, updated_at=now))
+    session.info.pop('data_changed', None)
+
+
+@db.event.listens_for(db.session, 'after_rollback')
+def clear_data_changed(session):
+    session.info.pop('data_changed', None)
+    session.info.pop('wear_alerts', None)
+
+
+# Po zapisie w tym procesie od razu zwalniamy pamięć podręczną; inne procesy
+# zauważą zmianę po numerze wersji w bazie
+@db.event.listens_for(db.session, 'after_commit')
+def invalidate_read_cache(session):
+    read_cache.clear()
+    if has_app_context():
+        g.pop('data_version', None)
+    if session.info.pop('wear_alerts', False):
+        alert_broadcaster.notify()
+
+
+def current_data_version():
+    # Odczytywana raz na żądanie - korzystają z niej zarówno ETag, jak i pamięć podręczna
+    if has_app_context() and 'data_version' in g:
+        return g.data_version
+    table = DataVersion.__table__
+    row = db.session.execute(db.select(table.c.version, table.c.updated_at).where(table.c.id == 1)).first()
+    data_version = (row.version, row.updated_at) if row else (0, None)
+    if has_app_context():
+        g.data_version = data_version
+    return data_version
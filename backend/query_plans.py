@@ -0,0 +1,45 @@
+# Kontrola planów zapytań (EXPLAIN QUERY PLAN) dla zapytań wysyłanych przez endpointy.
+# Zapytanie nie przechodzi kontroli, jeśli przegląda całą tabelę (SCAN) albo sortuje
+# w tymczasowym B-drzewie, chyba że endpoint jawnie na to pozwala.
+import re
+
+from sqlalchemy import event
+
+
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)")
+TEMP_SORT_PATTERN = re.compile(r"USE TEMP B-TREE")
+
+
+class StatementRecorder:
+    # Zbiera zapytania SELECT wykonane na silniku w trakcie bloku "with"
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+
+def explain(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def plan_violations(plan, tables, allowed_scans=(), allow_temp_sort=False):
+    # tables - nazwy prawdziwych tabel; skany podzapytań, CTE i tabel wirtualnych pomijamy
+    violations = []
+    for detail in plan:
+        scan = SCAN_PATTERN.match(detail)
+        if scan and scan.group(1) in tables and scan.group(1) not in allowed_scans:
+            violations.append(detail)
+        if TEMP_SORT_PATTERN.search(detail) and not allow_temp_sort:
+            violations.append(detail)
+    return violations
@@ -0,0 +1,79 @@
+# Wspólne elementy odpowiedzi: pamięć podręczna i warunkowy GET list, format kolumnowy
+# i kompresja odpowiedzi.
+import functools
+from datetime import timezone
+
+from flask import current_app, request
+
+from extensions import read_cache
+from models import current_data_version
+from serialization import compress_response, to_columnar
+
+
+# Odpowiedź z pamięci podręcznej procesu, o ile od jej zapisania nie zmieniła się wersja danych
+def cached_get(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        version, _ = current_data_version()
+        key = request.full_path
+        body = read_cache.get(key, version)
+        if body is not None:
+            return current_app.response_class(body, mimetype='application/json')
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            read_cache.put(key, version, response.get_data())
+        return response
+    return wrapper
+
+
+# Warunkowy GET: niezmienione listy zwracają 304 bez zapytań ORM i serializacji
+def conditional_get(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        version, updated_at = current_data_version()
+        etag = f"v{version}"
+
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)  # ETag po kompresji jest słaby
+        else:
+            not_modified = bool(
+                updated_at and request.if_modified_since
+                and updated_at.replace(microsecond=0, tzinfo=timezone.utc) <= request.if_modified_since
+            )
+
+        if not_modified:
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        if updated_at:
+            response.last_modified = updated_at.replace(tzinfo=timezone.utc)
+        response.cache_control.no_cache = True  # Przeglądarka zawsze pyta serwer, ale może dostać 304
+        return response
+    return wrapper
+
+
+# Kompresja odpowiedzi uzgadniana nagłówkiem Accept-Encoding (eksporty strumieniowe i SSE bez kompresji);
+# rejestrowana w create_app jako after_request
+def compress(response):
+    config = current_app.config
+    return compress_response(response, request.accept_encodings, config['COMPRESS_MIN_SIZE'], config['COMPRESS_LEVEL'])
+
+
+# ?format=columnar: lista jako {kolumna: [wartości]} zamiast listy obiektów z powtarzanymi kluczami
+RESPONSE_FORMATS = ('rows', 'columnar')
+
+
+def requested_format():
+    fmt = request.args.get('format', 'rows')
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(RESPONSE_FORMATS)}")
+    return fmt
+
+
+def format_records(records, columns, fmt):
+    return to_columnar(records, columns) if fmt == 'columnar' else records
@@ -0,0 +1,135 @@
+# Indeks pełnotekstowy (SQLite FTS5) dla części, samochodów, wydarzeń i historii części.
+# Indeks jest utrzymywany przez triggery w bazie, więc każdy INSERT/UPDATE/DELETE
+# (również masowy lub kaskadowy) od razu trafia do wyszukiwarki.
+import re
+
+from sqlalchemy import Integer, text
+
+
+# Rodzaj rekordu jest zakodowany w rowid indeksu (rowid = id * 8 + kod),
+# dzięki czemu triggery usuwają wpis po kluczu zamiast skanować cały indeks
+SEARCH_KINDS = {
+    'part': 1,
+    'car': 2,
+    'event': 3,
+    'part_history': 4,
+}
+
+# Wagi kolumn dla bm25 (kind, ref_id, parent_id, title, code, body)
+SEARCH_WEIGHTS = (0.0, 0.0, 0.0, 10.0, 5.0, 1.0)
+
+# Źródła indeksu: rodzaj -> (tabela, wyrażenia SQL dla parent_id, title, code, body, warunek,
+# kolumny indeksowane). "{row}" to NEW w triggerach albo alias tabeli przy przebudowie indeksu.
+# Trigger UPDATE reaguje tylko na zmianę kolumn indeksowanych, więc np. zmiana przebiegu
+# nie przepisuje wpisu w indeksie.
+SEARCH_SOURCES = {
+    'part': (
+        'part', 'NULL', '{row}.name', '{row}.part_number', '{row}.notes', '1',
+        ('name', 'part_number', 'notes')
+    ),
+    'car': ('car', 'NULL', '{row}.driver', '{row}.chassis_number', 'NULL', '1', ('driver', 'chassis_number')),
+    'event': ('event', 'NULL', '{row}.name', 'NULL', '{row}.notes', '1', ('name', 'notes')),
+    'part_history': (
+        'part_history', '{row}.part_id', '{row}.changed_field', 'NULL', '{row}.notes',
+        "{row}.notes IS NOT NULL AND {row}.notes <> ''", ('part_id', 'changed_field', 'notes')
+    ),
+}
+
+CREATE_SEARCH_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "kind UNINDEXED, ref_id UNINDEXED, parent_id UNINDEXED, title, code, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+
+def _insert_sql(kind, row, from_clause=""):
+    table, parent_id, title, code, body, condition, _ = SEARCH_SOURCES[kind]
+    columns = ", ".join(expr.format(row=row) for expr in (parent_id, title, code, body))
+    return (
+        "INSERT INTO search_index(rowid, kind, ref_id, parent_id, title, code, body) "
+        f"SELECT {row}.id * 8 + {SEARCH_KINDS[kind]}, '{kind}', {row}.id, {columns} "
+        f"{from_clause} WHERE {condition.format(row=row)}"
+    )
+
+
+def _trigger_sql(kind):
+    table, columns = SEARCH_SOURCES[kind][0], ", ".join(SEARCH_SOURCES[kind][6])
+    insert = _insert_sql(kind, 'NEW')
+    delete = f"DELETE FROM search_index WHERE rowid = OLD.id * 8 + {SEARCH_KINDS[kind]}"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} BEGIN {insert}; END",
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete}; {insert}; END",
+        f"CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} BEGIN {delete}; END",
+    ]
+
+
+def create_search_index(connection):
+    # Tworzy tabelę FTS5 i triggery; przy pierwszym utworzeniu indeksuje istniejące dane
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    ).first()
+    connection.execute(text(CREATE_SEARCH_TABLE))
+    for kind in SEARCH_SOURCES:
+        for statement in _trigger_sql(kind):
+            connection.execute(text(statement))
+    if not exists:
+        rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection):
+    connection.execute(text("DELETE FROM search_index"))
+    for kind, source in SEARCH_SOURCES.items():
+        connection.execute(text(_insert_sql(kind, 'src', f"FROM {source[0]} AS src")))
+
+
+def build_match_query(phrase):
+    # Każde słowo jako fraza-prefiks w cudzysłowie - użytkownik nie musi znać składni FTS5,
+    # a numery typu "PN-1-0" dopasowują się jako ciąg kolejnych tokenów
+    phrases = []
+    for word in phrase.split():
+        tokens = re.findall(r"\w+", word, flags=re.UNICODE)
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"*')
+    return " ".join(phrases)
+
+
+def search_index_ids(kind, match, columns):
+    # Podzapytanie z id rekordów danego rodzaju pasujących do frazy w wybranych kolumnach indeksu -
+    # filtr list (np. /get-parts?search=) wyszukiwany w FTS5 zamiast LIKE '%...%' po całej tabeli
+    return text(
+        f"SELECT ref_id FROM search_index WHERE search_index MATCH :match_{kind} AND kind = :kind_{kind}"
+    ).bindparams(**{
+        f"match_{kind}": f"{{{' '.join(columns)}}} : ({match})",
+        f"kind_{kind}": kind
+    }).columns(ref_id=Integer)
+
+
+def search_index(connection, phrase, kinds=None, limit=20):
+    match = build_match_query(phrase)
+    if not match:
+        return []
+
+    # Ranking przez ukrytą kolumnę "rank" - FTS5 sortuje wyniki sam, bez tymczasowego B-drzewa
+    params = {'match': match, 'rank': f"bm25({', '.join(map(str, SEARCH_WEIGHTS))})", 'limit': limit}
+    kind_filter = ""
+    if kinds:
+        names = list(kinds)
+        kind_filter = " AND kind IN (" + ", ".join(f":kind_{i}" for i in range(len(names))) + ")"
+        params.update({f"kind_{i}": kind for i, kind in enumerate(names)})
+
+    rows = connection.execute(text(
+        "SELECT kind, ref_id, parent_id, title, code, "
+        "snippet(search_index, -1, '[', ']', '…', 12) AS snippet, rank "
+        f"FROM search_index WHERE search_index MATCH :match AND rank MATCH :rank{kind_filter} "
+        "ORDER BY rank LIMIT :limit"
+    ), params).mappings()
+
+    return [{
+        'kind': row['kind'],
+        'id': row['ref_id'],
+        'parent_id': row['parent_id'],
+        'title': row['title'],
+        'code': row['code'],
+        'snippet': row['snippet'],
+        'rank': round(row['rank'], 4)
+    } for row in rows]
@@ -0,0 +1,68 @@
+# Kodowanie odpowiedzi: szybszy dostawca JSON (orjson), format kolumnowy list i kompresja gzip.
+# FastJSONProvider daje ten sam JSON co domyślny dostawca Flaska (posortowane klucze, daty
+# w formacie HTTP), poza znakami spoza ASCII - orjson zapisuje je w UTF-8 zamiast \uXXXX.
+import gzip
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego zostaje moduł json
+    orjson = None
+
+
+if orjson is not None:
+    # Daty przekazujemy do DefaultJSONProvider.default, żeby zachować dotychczasowy format
+    ORJSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/csv'}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def _encode(self, obj, indent=False):
+        option = ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:  # Np. liczba całkowita większa niż 64 bity - koduje moduł json
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        body = self._encode(obj)
+        return body.decode() if body is not None else super().dumps(obj)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = self._encode(obj, indent)
+        if body is None:
+            return super().response(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def to_columnar(records, columns):
+    # Lista słowników -> {kolumna: [wartości]}; klucze wysyłane raz, nie w każdym wierszu
+    return {column: [record[column] for record in records] for column in columns}
+
+
+def compress_response(response, accept_encodings, min_size, level):
+    if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not accept_encodings['gzip']:
+        return response
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=level, mtime=0))
+    response.headers['Content-Encoding'] = 'gzip'
+    # Skompresowana treść to inna reprezentacja - ETag staje się słaby (tak jak w NGINX)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,87 @@
+# Warstwa dostępu do SQLite: tryb WAL, pragmy ustawiane przy połączeniu,
+# osobna pula połączeń tylko do odczytu dla żądań GET i jedno połączenie zapisujące.
+# Zapisy czekają w kolejce na połączenie zapisujące (pula o rozmiarze 1), a transakcja
+# zapisu od razu zajmuje blokadę bazy (BEGIN IMMEDIATE), ponawiając próbę przy "database is locked".
+import time
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+
+BUSY_TIMEOUT_MS = 5000
+BEGIN_RETRIES = 5
+BEGIN_RETRY_DELAY = 0.05
+READER_BIND = 'reader'
+READ_METHODS = ('GET', 'HEAD')
+
+# Pragmy wspólne dla wszystkich połączeń
+CONNECTION_PRAGMAS = (
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+
+
+def configure_sqlite_engine(engine, read_only=False):
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        # Transakcjami sterujemy sami (zdarzenie "begin"), a nie sterownik pysqlite
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            cursor.execute("PRAGMA journal_mode = WAL")
+        for pragma in CONNECTION_PRAGMAS:
+            cursor.execute(pragma)
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def begin_transaction(connection):
+        if read_only:
+            connection.exec_driver_sql("BEGIN")
+            return
+
+        # Blokada zapisu na początku transakcji, żeby nie wywrócić jej w połowie;
+        # busy_timeout czeka na innych piszących, a po jego wyczerpaniu ponawiamy
+        for attempt in range(BEGIN_RETRIES):
+            try:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
+                return
+            except OperationalError as e:
+                if 'locked' not in str(e.orig) or attempt == BEGIN_RETRIES - 1:
+                    raise
+                time.sleep(BEGIN_RETRY_DELAY * (2 ** attempt))
+
+
+class RoutingSession(Session):
+    # Żądania GET/HEAD czytają przez pulę tylko do odczytu, więc nie czekają na zapisy (WAL).
+    # W trybie wsadowym (info['batch_savepoint'] ustawione przez /batch) commit() handlera tylko
+    # zapisuje zmiany w bieżącej transakcji, a rollback() cofa jedynie operację do jej punktu zapisu.
+    def commit(self):
+        if self.info.get('batch_savepoint') is not None:
+            self.flush()
+            return
+        super().commit()
+
+    def rollback(self):
+        savepoint = self.info.get('batch_savepoint')
+        if savepoint is not None:
+            if savepoint.is_active:
+                savepoint.rollback()
+            return
+        super().rollback()
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and has_request_context()
+            and request.method in READ_METHODS
+            and READER_BIND in self._db.engines
+        ):
+            return self._db.engines[READER_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,59 @@
+# Wspólne fixture'y testów: aplikacja na tymczasowej bazie SQLite zbudowanej jak przez "flask init-db"
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from commands import init_db  # noqa: E402
+from extensions import db, read_cache  # noqa: E402
+from models import Part  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}"
+    })
+    with app.app_context():
+        init_db()
+    # Pamięć podręczna odczytów jest globalna dla procesu - wersje danych kolejnych baz się powtarzają
+    read_cache.clear()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def add_part(app, client):
+    # Tworzy typ części i auto (przy pierwszym użyciu) oraz część przez API
+    created = {}
+
+    def add(number, mileage=100, car_id=None):
+        if 'part_type_id' not in created:
+            created['part_type_id'] = client.post(
+                '/add-part-type', json={'name': 'Turbo', 'max_mileage': 100000}
+            ).get_json()['part_type']['id']
+            created['car_id'] = client.post(
+                '/add-car', json={'chassis_number': '001', 'driver': 'Driver'}
+            ).get_json()['car']['id']
+        response = client.post('/add-part', json={
+            'name': f'Part {number}',
+            'mileage': mileage,
+            'part_number': f'PN-{number}',
+            'car_id': car_id or created['car_id'],
+            'part_type_id': created['part_type_id']
+        })
+        assert response.status_code == 201, response.get_json()
+        with app.app_context():
+            return db.session.scalar(db.select(Part.id).where(Part.part_number == f'PN-{number}'))
+
+    return add
@@ -0,0 +1,22 @@
+# Limit otwartych strumieni alertów (SSE) na proces
+from extensions import alert_broadcaster
+
+
+def test_stream_limit(app, client):
+    app.config['ALERT_STREAM_LIMIT'] = 2
+    streams = [client.get('/alerts/stream', buffered=False) for _ in range(2)]
+    assert [stream.status_code for stream in streams] == [200, 200]
+    assert next(streams[0].response).startswith(b'retry:')
+
+    rejected = client.get('/alerts/stream')
+    assert rejected.status_code == 503
+    assert rejected.headers['Retry-After']
+
+    # Rozłączenie klienta zwalnia miejsce
+    streams[0].close()
+    replacement = client.get('/alerts/stream', buffered=False)
+    assert replacement.status_code == 200
+
+    for stream in (streams[1], replacement):
+        stream.close()
+    assert alert_broadcaster.open_streams == 0
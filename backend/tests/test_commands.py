@@ -0,0 +1,59 @@
+# Polecenia kontrolne CLI uruchamiane na zasianej bazie testowej: check-query-plans i benchmarki
+import pytest
+
+from commands import register_commands
+
+
+@pytest.fixture
+def cli(app, client):
+    register_commands(app)
+    part_types = [
+        client.post('/add-part-type', json={'name': 'Turbo', 'max_mileage': 1000}).get_json()['part_type']['id'],
+        client.post('/add-part-type', json={'name': 'Brake'}).get_json()['part_type']['id'],
+    ]
+    cars = [
+        client.post('/add-car', json={'chassis_number': f'{number:03d}', 'driver': f'Driver {number}'}).get_json()['car']['id']
+        for number in range(1, 4)
+    ]
+    for number in range(12):
+        response = client.post('/add-part', json={
+            'name': f'Part {number}',
+            'mileage': 100 * number,
+            'part_number': f'PN-{number}',
+            'car_id': cars[number % len(cars)],
+            'part_type_id': part_types[number % len(part_types)],
+            'notes': 'gravel setup'
+        })
+        assert response.status_code == 201, response.get_json()
+    event = client.post('/add-event', json={'name': 'Rally', 'notes': '', 'date': '2026-05-01'}).get_json()
+    event_id = event['event']['id']
+    for car_id in cars[:2]:
+        assert client.post('/add-car-to-event', json={'event_id': event_id, 'car_id': car_id}).status_code == 201
+
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['snapshot-fleet', '--force']).exit_code == 0
+    # Zmiany po punkcie kontrolnym: rejestr przebiegu, alerty zużycia, historia części i auta
+    assert client.put(f'/add-mileage-for-event/{event_id}', json={'mileage': 450}).status_code == 200
+    assert client.put(f'/update-mileage/{cars[2]}', json={'mileage': 900}).status_code == 200
+    assert client.put(f'/update-car/{cars[2]}', json={'chassis_number': '009', 'driver': 'Reserve'}).status_code == 200
+    return runner
+
+
+def test_query_plans(cli):
+    result = cli.invoke(args=['check-query-plans'])
+    assert result.exit_code == 0, result.output
+    assert 'All query plans OK' in result.output
+
+
+def test_benchmark_formats(cli):
+    result = cli.invoke(args=['benchmark-formats', '--repeat', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'HTTP' not in result.output, result.output
+
+
+def test_benchmark_startup(app, cli, monkeypatch):
+    # Procesy pomiarowe budują aplikację z konfiguracji środowiska - ta sama baza testowa
+    monkeypatch.setenv('MSRT_SQLALCHEMY_DATABASE_URI', app.config['SQLALCHEMY_DATABASE_URI'])
+    result = cli.invoke(args=['benchmark-startup', '--repeat', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'ready' in result.output
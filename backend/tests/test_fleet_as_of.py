@@ -0,0 +1,116 @@
+# Stan floty na wybraną chwilę (/as-of) a usuwanie części
+from datetime import datetime, timedelta
+
+from extensions import db
+from models import FleetSnapshot, FleetSnapshotPart, MileageEntry, Part, PartHistory
+from views.fleet import take_fleet_snapshot
+
+
+def as_of_parts(client, at):
+    response = client.get('/as-of', query_string={'at': at.isoformat()})
+    assert response.status_code == 200, response.get_json()
+    return {
+        part['part_id']: dict(part, car_id=car['car_id'])
+        for car in response.get_json()['cars']
+        for part in car['parts']
+    }
+
+
+def backdate_parts(app, when):
+    with app.app_context():
+        db.session.execute(db.update(Part).values(created_at=when))
+        db.session.commit()
+
+
+def test_part_deleted_after_checkpoint_is_dropped(app, client, add_part):
+    now = datetime.utcnow()
+    kept = add_part(1)
+    deleted = add_part(2)
+    backdate_parts(app, now - timedelta(days=10))
+    with app.app_context():
+        snapshot = take_fleet_snapshot()
+        snapshot.taken_at = now - timedelta(days=5)
+        db.session.commit()
+
+    assert client.delete(f'/delete-part/{deleted}').status_code == 200
+
+    parts = as_of_parts(client, now + timedelta(hours=1))
+    assert set(parts) == {kept}
+    # Przed usunięciem część nadal należy do floty
+    assert set(as_of_parts(client, now - timedelta(days=1))) == {kept, deleted}
+
+
+def test_part_deleted_after_at_is_restored(app, client, add_part):
+    now = datetime.utcnow()
+    first_car = client.post('/add-car', json={'chassis_number': '002', 'driver': 'First'}).get_json()['car']['id']
+    add_part(1)
+    deleted = add_part(2, mileage=900, car_id=first_car)
+    backdate_parts(app, now - timedelta(days=10))
+    with app.app_context():
+        part = db.session.get(Part, deleted)
+        second_car = Part.query.filter(Part.id != deleted).one().car_id
+        # Dzień temu: przebieg 900 -> 1000 i przeniesienie do drugiego auta
+        part.mileage = 1000
+        part.car_id = second_car
+        db.session.add(MileageEntry(
+            part_id=deleted, car_id=second_car, delta=100, odometer=1000, timestamp=now - timedelta(days=1)
+        ))
+        db.session.add(PartHistory(
+            part_id=deleted, changed_field='car_id', old_value=str(first_car), new_value=str(second_car),
+            timestamp=now - timedelta(days=1)
+        ))
+        db.session.commit()
+        assert db.session.scalar(db.select(db.func.count()).select_from(FleetSnapshot)) == 0
+
+    assert client.delete(f'/delete-part/{deleted}').status_code == 200
+
+    parts = as_of_parts(client, now - timedelta(days=2))
+    assert deleted in parts
+    assert parts[deleted]['car_id'] == first_car
+    assert parts[deleted]['mileage'] == 900
+    assert parts[deleted]['part_number'] == 'PN-2'
+    # Część usunięta przed wybraną chwilą nie wraca
+    assert deleted not in as_of_parts(client, now + timedelta(hours=1))
+
+
+def test_replay_with_and_without_checkpoint(app, client, add_part):
+    now = datetime.utcnow()
+    first_car = client.post('/add-car', json={'chassis_number': '002', 'driver': 'First'}).get_json()['car']['id']
+    add_part(1)
+    moved = add_part(2, mileage=500, car_id=first_car)
+    backdate_parts(app, now - timedelta(days=10))
+    with app.app_context():
+        second_car = Part.query.filter(Part.id != moved).one().car_id
+        part = db.session.get(Part, moved)
+        part.mileage = 700
+        part.car_id = second_car
+        for days, odometer in ((4, 600), (2, 700)):
+            db.session.add(MileageEntry(
+                part_id=moved, car_id=first_car, delta=100, odometer=odometer, timestamp=now - timedelta(days=days)
+            ))
+        db.session.add(PartHistory(
+            part_id=moved, changed_field='car_id', old_value=str(first_car), new_value=str(second_car),
+            timestamp=now - timedelta(days=2)
+        ))
+        db.session.commit()
+
+    # Bez punktu kontrolnego: wstecz od stanu bieżącego
+    parts = as_of_parts(client, now - timedelta(days=3))
+    assert (parts[moved]['car_id'], parts[moved]['mileage']) == (first_car, 600)
+
+    with app.app_context():
+        snapshot = take_fleet_snapshot()
+        db.session.flush()
+        db.session.execute(
+            db.update(FleetSnapshotPart)
+            .where(FleetSnapshotPart.snapshot_id == snapshot.id, FleetSnapshotPart.part_id == moved)
+            .values(car_id=first_car, mileage=500)
+        )
+        snapshot.taken_at = now - timedelta(days=5)
+        db.session.commit()
+
+    # Od punktu kontrolnego: ostatnie zmiany z okresu [punkt, at)
+    parts = as_of_parts(client, now - timedelta(days=3))
+    assert (parts[moved]['car_id'], parts[moved]['mileage']) == (first_car, 600)
+    parts = as_of_parts(client, now - timedelta(days=1))
+    assert (parts[moved]['car_id'], parts[moved]['mileage']) == (second_car, 700)
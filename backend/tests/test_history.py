@@ -0,0 +1,44 @@
+# Stronicowanie historii części kluczem (timestamp, id)
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models import PartHistory
+
+
+@pytest.mark.parametrize('order', ['desc', 'asc'])
+def test_history_pages_skip_entries_without_timestamp(app, client, add_part, order):
+    part_id = add_part(1)
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(db.delete(PartHistory).where(PartHistory.part_id == part_id))
+        for number in range(3):
+            db.session.add(PartHistory(
+                part_id=part_id, changed_field='notes', old_value=None, new_value=f'dated {number}',
+                timestamp=now - timedelta(days=number)
+            ))
+        db.session.flush()
+        # Wpisy bez daty - ostatni w kolejności id
+        for number in range(2):
+            db.session.execute(db.insert(PartHistory).values(
+                part_id=part_id, changed_field='notes', new_value=f'undated {number}', timestamp=None
+            ))
+        db.session.commit()
+
+    values = []
+    cursor = None
+    while True:
+        query = {'limit': 1, 'order': order}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get(f'/part-history/{part_id}', query_string=query)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        values.extend(record['new_value'] for record in body['history'])
+        cursor = body['next_cursor']
+        if cursor is None:
+            break
+
+    expected = ['dated 0', 'dated 1', 'dated 2']
+    assert values == (expected if order == 'desc' else expected[::-1])
@@ -0,0 +1,23 @@
+# Usuwanie typów części
+from extensions import db
+from models import Part, PartType
+
+
+def test_delete_part_type_in_use_is_rejected(app, client, add_part):
+    part_id = add_part(1)
+    with app.app_context():
+        part_type_id = db.session.get(Part, part_id).part_type_id
+
+    response = client.delete(f'/delete-part-type/{part_type_id}')
+    assert response.status_code == 409
+    assert response.get_json()['part_count'] == 1
+    with app.app_context():
+        assert db.session.get(Part, part_id) is not None
+
+
+def test_delete_unused_part_type(app, client):
+    part_type_id = client.post('/add-part-type', json={'name': 'Brake'}).get_json()['part_type']['id']
+
+    assert client.delete(f'/delete-part-type/{part_type_id}').status_code == 200
+    with app.app_context():
+        assert db.session.get(PartType, part_type_id) is None
@@ -0,0 +1,36 @@
+# Lista części: wyszukiwanie przez indeks FTS5
+import pytest
+
+
+@pytest.fixture
+def searchable(client):
+    part_type_id = client.post('/add-part-type', json={'name': 'Turbo'}).get_json()['part_type']['id']
+    cars = [
+        client.post('/add-car', json={'chassis_number': number, 'driver': driver}).get_json()['car']['id']
+        for number, driver in (('A12', 'Kowalski'), ('B07', 'Nowak'))
+    ]
+    for name, part_number, car_id in (
+        ('Turbocharger', 'PN-1-0', cars[0]),
+        ('Brake pad', 'XK-22', cars[1]),
+        ('Gearbox', 'GB-7', cars[1]),
+    ):
+        response = client.post('/add-part', json={
+            'name': name, 'part_number': part_number, 'mileage': 1, 'car_id': car_id,
+            'part_type_id': part_type_id, 'notes': 'turbo'
+        })
+        assert response.status_code == 201
+
+
+@pytest.mark.parametrize('search, expected', [
+    ('turbo', ['Turbocharger']),  # Prefiks nazwy; notatki nie są przeszukiwane
+    ('PN-1', ['Turbocharger']),
+    ('xk', ['Brake pad']),
+    ('b07', ['Brake pad', 'Gearbox']),  # Numer nadwozia auta
+    ('brake pad', ['Brake pad']),
+    ('Nowak', []),  # Kierowca nie jest przeszukiwany
+    ('---', []),
+])
+def test_search_parts(client, searchable, search, expected):
+    response = client.get('/get-parts', query_string={'search': search})
+    assert response.status_code == 200
+    assert [part['name'] for part in response.get_json()['parts']] == expected
@@ -0,0 +1,56 @@
+# Liczba zapytań list części nie może rosnąć z liczbą części (brak N+1)
+import pytest
+from sqlalchemy import event
+
+from extensions import db, read_cache
+from models import Part
+
+
+def add_parts(app, template_id, count):
+    with app.app_context():
+        template = db.session.get(Part, template_id)
+        start = db.session.scalar(db.select(db.func.count()).select_from(Part))
+        db.session.add_all([
+            Part(
+                name=f'Bulk {number}',
+                mileage=number,
+                part_number=f'BULK-{number}',
+                car_id=template.car_id,
+                part_type_id=template.part_type_id
+            )
+            for number in range(start, start + count)
+        ])
+        db.session.commit()
+        return template.car_id
+
+
+def count_statements(app, client, url):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    read_cache.clear()
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(url)
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200, response.get_json()
+    return len(statements)
+
+
+@pytest.mark.parametrize('url', ['/get-parts', '/get-parts?sort=car_chassis_number', '/get-parts-for-car/{car_id}'])
+def test_part_lists_query_count_does_not_grow(app, client, add_part, url):
+    car_id = add_parts(app, add_part(0), 9)
+    url = url.format(car_id=car_id)
+    few = count_statements(app, client, url)
+
+    add_parts(app, add_part(1), 190)
+    many = count_statements(app, client, url)
+
+    assert 0 < few == many
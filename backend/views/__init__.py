@@ -0,0 +1 @@
+# Blueprinty z endpointami API (rejestrowane w app.create_app)
@@ -0,0 +1,131 @@
+# Endpointy alertów zużycia: lista, potwierdzanie i strumień SSE
+import json
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from alerts import format_sse
+from extensions import alert_broadcaster, db
+from models import Part, WearAlert
+from responses import cached_get
+from storage import READER_BIND
+
+
+bp = Blueprint('alerts', __name__)
+
+
+# Alerty zużycia - powstają przy zapisie przebiegu (record_wear_alerts), tu tylko odczyt i potwierdzanie
+WEAR_ALERT_STATUSES = {
+    'open': WearAlert.acknowledged_at.is_(None),
+    'acknowledged': WearAlert.acknowledged_at.is_not(None),
+    'all': db.true()
+}
+WEAR_ALERT_COLUMNS = (
+    WearAlert.id,
+    WearAlert.part_id,
+    Part.name.label('part_name'),
+    WearAlert.car_id,
+    WearAlert.level,
+    WearAlert.mileage,
+    WearAlert.max_mileage,
+    WearAlert.created_at,
+    WearAlert.acknowledged_at
+)
+
+
+def serialize_wear_alert(row):
+    alert = dict(row)
+    alert['created_at'] = alert['created_at'].isoformat() if alert['created_at'] else None
+    alert['acknowledged_at'] = alert['acknowledged_at'].isoformat() if alert['acknowledged_at'] else None
+    return alert
+
+
+@bp.route('/alerts', methods=['GET'])
+@cached_get
+def get_alerts():
+    status = request.args.get('status', 'open')
+    if status not in WEAR_ALERT_STATUSES:
+        return jsonify({'error': f"status must be one of: {', '.join(WEAR_ALERT_STATUSES)}"}), 400
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    if limit < 1:
+        return jsonify({'error': 'limit must be positive'}), 400
+
+    query = (
+        db.select(*WEAR_ALERT_COLUMNS)
+        .join(Part, Part.id == WearAlert.part_id)
+        .where(WEAR_ALERT_STATUSES[status])
+        .order_by(WearAlert.id.desc())
+        .limit(limit)
+    )
+    car_id = request.args.get('car_id', type=int)
+    if car_id is not None:
+        query = query.where(WearAlert.car_id == car_id)
+
+    alerts = [serialize_wear_alert(row) for row in db.session.execute(query).mappings()]
+    return jsonify({'status': status, 'alerts': alerts}), 200
+
+
+# Potwierdzenie alertu; ponowne potwierdzenie nie zmienia pierwotnej daty
+@bp.route('/alerts/<int:alert_id>/acknowledge', methods=['PUT'])
+def acknowledge_alert(alert_id):
+    alert = db.session.get(WearAlert, alert_id)
+    if alert is None:
+        return jsonify({'error': 'Alert not found'}), 404
+    if alert.acknowledged_at is None:
+        alert.acknowledged_at = datetime.utcnow()
+        db.session.commit()
+    return jsonify({'message': 'Alert acknowledged', 'id': alert.id,
+                    'acknowledged_at': alert.acknowledged_at.isoformat()}), 200
+
+
+# Strumień nowych alertów (Server-Sent Events). Klient po ponownym połączeniu wysyła
+# Last-Event-ID i dostaje alerty, które go ominęły; nowe połączenie zaczyna od bieżących.
+# Liczba otwartych strumieni procesu jest ograniczona (ALERT_STREAM_LIMIT) - kolejne dostają 503.
+@bp.route('/alerts/stream', methods=['GET'])
+def stream_alerts():
+    last_id = request.headers.get('Last-Event-ID', request.args.get('last_id'))
+    try:
+        last_id = int(last_id) if last_id is not None else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an alert id'}), 400
+
+    reader = db.engines[READER_BIND]
+    query = (
+        db.select(*WEAR_ALERT_COLUMNS)
+        .join(Part, Part.id == WearAlert.part_id)
+        .where(WearAlert.id > db.bindparam('last_id'))
+        .order_by(WearAlert.id)
+    )
+    if last_id is None:
+        with reader.connect() as connection:
+            last_id = connection.scalar(db.select(db.func.coalesce(db.func.max(WearAlert.id), 0)))
+    poll_seconds = current_app.config['ALERT_POLL_SECONDS']
+
+    if not alert_broadcaster.open_stream(current_app.config['ALERT_STREAM_LIMIT']):
+        response = jsonify({'error': 'Too many open alert streams'})
+        response.headers['Retry-After'] = str(poll_seconds)
+        return response, 503
+
+    def generate():
+        nonlocal last_id
+        generation = alert_broadcaster.generation()
+        yield f"retry: {poll_seconds * 1000}\n\n"
+        while True:
+            # Połączenie tylko na czas zapytania - czekający strumień nie trzyma połączenia z puli
+            with reader.connect() as connection:
+                rows = connection.execute(query, {'last_id': last_id}).mappings().all()
+            for row in rows:
+                last_id = row['id']
+                yield format_sse(json.dumps(serialize_wear_alert(row)), event='wear-alert', event_id=row['id'])
+            if not rows:
+                yield ": keepalive\n\n"
+            generation = alert_broadcaster.wait(generation, poll_seconds)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.call_on_close(alert_broadcaster.close_stream)  # Rozłączenie klienta zwalnia miejsce
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Bez buforowania w proxy (nginx)
+    return response
@@ -0,0 +1,88 @@
+# Endpoint wsadowy /batch
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+from extensions import db
+
+
+bp = Blueprint('batch', __name__)
+
+
+# Endpoint wsadowy: lista operacji wykonywanych istniejącymi endpointami w jednej transakcji
+# i z jednym zatwierdzeniem. Każda operacja ma własny punkt zapisu (SAVEPOINT), więc błąd cofa
+# tylko ją; przy "atomic": true (domyślnie) pierwszy błąd wycofuje cały wsad.
+# {"operations": [{"method": "PUT", "path": "/update-part/3", "body": {...}}, ...], "atomic": true}
+BATCH_MAX_OPERATIONS = 200
+BATCH_METHODS = ('POST', 'PUT', 'DELETE')  # Odczyty (GET) szłyby pulą czytającą, bez zmian z tego wsadu
+
+
+def run_batch_operation(operation):
+    # Zwraca (status, treść odpowiedzi) pojedynczej operacji
+    if not isinstance(operation, dict) or not isinstance(operation.get('path'), str):
+        return 400, {'error': 'Operation must have a path'}
+    method = str(operation.get('method', 'POST')).upper()
+    if method not in BATCH_METHODS:
+        return 400, {'error': f"Method must be one of: {', '.join(BATCH_METHODS)}"}
+
+    path = operation['path']
+    try:
+        endpoint, view_args = current_app.url_map.bind('').match(path, method=method)
+    except HTTPException as e:
+        return e.code, {'error': e.description}
+    if endpoint == request.endpoint:
+        return 400, {'error': 'Nested batch is not allowed'}
+
+    # Kontekst żądania operacji współdzieli kontekst aplikacji, a więc i sesję bazy danych
+    with current_app.test_request_context(path, method=method, json=operation.get('body')):
+        try:
+            response = current_app.make_response(current_app.view_functions[endpoint](**view_args))
+        except HTTPException as e:
+            return e.code, {'error': e.description}
+        return response.status_code, response.get_json(silent=True)
+
+
+@bp.route('/batch', methods=['POST'])
+def batch():
+    data = request.get_json()
+    if not data or not isinstance(data.get('operations'), list):
+        return jsonify({'error': 'Missing required data'}), 400
+    operations = data['operations']
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}), 400
+    atomic = data.get('atomic', True)
+
+    results = []
+    failed = False
+    try:
+        for operation in operations:
+            if failed and atomic:
+                results.append({'status': None, 'skipped': True})
+                continue
+
+            savepoint = db.session.begin_nested()
+            db.session.info['batch_savepoint'] = savepoint
+            try:
+                status, body = run_batch_operation(operation)
+            except Exception as e:
+                status, body = 500, {'error': 'Operation failed', 'details': str(e)}
+            finally:
+                db.session.info.pop('batch_savepoint', None)
+
+            if status < 400:
+                savepoint.commit()
+            else:
+                failed = True
+                if savepoint.is_active:
+                    savepoint.rollback()
+            results.append({'status': status, 'body': body})
+
+        if failed and atomic:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Batch failed', 'details': str(e), 'results': results}), 500
+
+    committed = not (failed and atomic)
+    return jsonify({'committed': committed, 'results': results}), 200 if committed else 409
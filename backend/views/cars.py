@@ -0,0 +1,219 @@
+# Endpointy samochodów i zbiorczy widok samochodu
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from extensions import db
+from models import Car, car_event, CarHistory, Event, Part
+from responses import cached_get, conditional_get, format_records, requested_format
+from views.history import car_history_sources, history_page
+from views.parts import parts_with_wear_query
+
+
+bp = Blueprint('cars', __name__)
+
+
+# Endpointy dla samochodów
+
+@bp.route('/add-car', methods=['POST'])
+def add_car():
+    data = request.get_json()
+    
+    if not data or 'chassis_number' not in data or 'driver' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+    
+    new_car = Car(chassis_number=data['chassis_number'], driver=data['driver'])
+    db.session.add(new_car)
+    db.session.commit()
+
+    return jsonify({'message': 'Car added successfully!', 'car': {
+        'id': new_car.id,
+        'chassis_number': new_car.chassis_number,
+        'driver': new_car.driver
+    }}), 201
+
+
+
+# Najnowsze wydarzenie każdego samochodu - jedno zapytanie agregujące zamiast sortowania w Pythonie.
+# SQLite przy max() zwraca pozostałe kolumny z wiersza o największej wartości,
+# więc nazwa pochodzi z wydarzenia o najpóźniejszej dacie (bez sortowania).
+def latest_event_per_car_subquery():
+    return (
+        db.select(
+            car_event.c.car_id,
+            Event.name.label('event_name'),
+            db.func.max(Event.date).label('event_date')
+        )
+        .join(Event, Event.id == car_event.c.event_id)
+        .group_by(car_event.c.car_id)
+        .subquery()
+    )
+
+
+# Endpoint do pobierania danych wszystkich samochodów
+CAR_LIST_COLUMNS = ('id', 'chassis_number', 'driver', 'last_event')
+
+
+@bp.route('/get-cars', methods=['GET'])
+@conditional_get
+@cached_get
+def get_cars():
+    try:
+        fmt = requested_format()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    last_event = latest_event_per_car_subquery()
+    rows = db.session.execute(
+        db.select(Car.id, Car.chassis_number, Car.driver, last_event.c.event_name)
+        .outerjoin(last_event, last_event.c.car_id == Car.id)
+        .order_by(Car.id)
+    ).mappings()
+
+    car_list = [{
+        'id': row['id'],
+        'chassis_number': row['chassis_number'],
+        'driver': row['driver'],
+        'last_event': row['event_name'] or "Brak wydarzeń"
+    } for row in rows]
+    return jsonify({'cars': format_records(car_list, CAR_LIST_COLUMNS, fmt)})
+
+
+
+
+# Endpoint do pobierania danych pojedynczego samochodu
+@bp.route('/get-car/<int:car_id>', methods=['GET'])
+@cached_get
+def get_car(car_id):
+    car = Car.query.get_or_404(car_id)
+    
+    return jsonify({
+        'id': car.id,
+        'chassis_number': car.chassis_number,
+        'driver': car.driver,
+        'events': [event.name for event in car.events]  # Lista nazw wydarzeń, w których uczestniczył samochód
+    })
+
+
+
+# Endpoint do edycji danych samochodu
+@bp.route('/update-car/<int:car_id>', methods=['PUT'])
+def update_car(car_id):
+    car = Car.query.get_or_404(car_id)
+    data = request.get_json()
+
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    # Sprawdź, czy zmienia się numer nadwozia
+    if 'chassis_number' in data and data['chassis_number'] != car.chassis_number:
+        # Zapisz starą wartość w historii
+        history_entry = CarHistory(
+            car_id=car.id,
+            changed_field="chassis_number",
+            old_value=car.chassis_number,
+            new_value=data['chassis_number'],
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(history_entry)
+        car.chassis_number = data['chassis_number']  # Zaktualizuj numer nadwozia
+
+    # Sprawdź, czy zmienia się kierowca
+    if 'driver' in data and data['driver'] != car.driver:
+        # Zapisz starą wartość w historii
+        history_entry = CarHistory(
+            car_id=car.id,
+            changed_field="driver",
+            old_value=car.driver,
+            new_value=data['driver'],
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(history_entry)
+        car.driver = data['driver']  # Zaktualizuj kierowcę
+
+    # Zapisz zmiany w bazie danych
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update car', 'details': str(e)}), 500
+
+    return jsonify({'message': 'Car updated successfully!', 'car': {
+        'id': car.id,
+        'chassis_number': car.chassis_number,
+        'driver': car.driver
+    }}), 200
+
+
+
+# Endpoint do usuwania samochodu
+@bp.route('/delete-car/<int:car_id>', methods=['DELETE'])
+def delete_car(car_id):
+    car = Car.query.get_or_404(car_id)  # Znajdź samochód na podstawie ID
+
+    # Usuń samochód z bazy danych
+    db.session.delete(car)
+    db.session.commit()
+
+    return jsonify({'message': 'Car deleted successfully!', 'car_id': car_id}), 200
+
+
+# Zbiorczy widok samochodu dla strony szczegółów: dane auta, części ze zużyciem, wydarzenia
+# i ostatnia historia. ?fields=car,parts,events,history wybiera sekcje (domyślnie wszystkie);
+# każda sekcja to jedno zapytanie (historia: bieżąca i archiwum), parametry limit/cursor
+# działają dla historii tak jak w /car-history.
+CAR_OVERVIEW_FIELDS = ('car', 'parts', 'events', 'history')
+
+
+@bp.route('/cars/<int:car_id>/overview', methods=['GET'])
+@cached_get
+def get_car_overview(car_id):
+    fields = [field for field in request.args.get('fields', ','.join(CAR_OVERVIEW_FIELDS)).split(',') if field]
+    unknown = [field for field in fields if field not in CAR_OVERVIEW_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown field: {', '.join(unknown)}"}), 400
+
+    car = db.session.execute(
+        db.select(Car.id, Car.chassis_number, Car.driver).where(Car.id == car_id)
+    ).mappings().first()
+    if car is None:
+        return jsonify({'error': 'Car not found'}), 404
+
+    overview = {'id': car['id']}
+    if 'car' in fields:
+        overview['car'] = dict(car)
+
+    if 'parts' in fields:
+        rows = db.session.execute(
+            parts_with_wear_query().where(Part.car_id == car_id).order_by(Part.id)
+        ).mappings()
+        overview['parts'] = [{
+            'id': row['id'],
+            'name': row['name'],
+            'part_number': row['part_number'],
+            'mileage': row['mileage'],
+            'notes': row['notes'],
+            'part_type_id': row['part_type_id'],
+            'part_type_name': row['part_type_name'],
+            'max_mileage': row['max_mileage'],
+            'usage_percentage': row['usage_percentage']
+        } for row in rows]
+
+    if 'events' in fields:
+        rows = db.session.execute(
+            db.select(Event.id, Event.name, Event.date, Event.notes)
+            .join(car_event, car_event.c.event_id == Event.id)
+            .where(car_event.c.car_id == car_id)
+            .order_by(Event.date, Event.id)
+        ).mappings()
+        overview['events'] = [dict(row) for row in rows]
+
+    if 'history' in fields:
+        try:
+            history, next_cursor = history_page(*car_history_sources(car_id))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        overview['history'] = [dict(row) for row in history]
+        overview['history_next_cursor'] = next_cursor
+
+    return jsonify(overview), 200
@@ -0,0 +1,220 @@
+# Endpointy wydarzeń i przypisania samochodów do wydarzeń
+from datetime import date
+
+from flask import Blueprint, current_app, jsonify, request
+
+from extensions import db
+from models import Car, Event
+from responses import cached_get, conditional_get, format_records, requested_format
+
+
+bp = Blueprint('events', __name__)
+
+
+# Endpointy dla wydarzeń
+
+# Endpoint do dodawania nowego wydarzenia
+
+@bp.route('/add-event', methods=['POST'])
+def add_event():
+    data = request.get_json()
+    
+    if not data or ('name' not in data or 'notes' not in data):
+        return jsonify({'error': 'Missing required data'}), 400
+
+    # Tworzymy nowe wydarzenie
+    new_event = Event(name=data['name'], notes=data['notes'])
+
+    if 'date' in data:
+        try:
+            new_event.date = date.fromisoformat(data['date'])  # Konwersja stringa "YYYY-MM-DD" na date
+        except ValueError:
+            return jsonify({'error': 'Invalid date format, expected YYYY-MM-DD'}), 400
+
+    # Dodajemy do bazy danych
+    db.session.add(new_event)
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Event added successfully!',
+        'event': {
+            'id': new_event.id,
+            'name': new_event.name,
+            'date': new_event.date.isoformat(),  # Zapewniamy poprawne zwracanie daty jako string "YYYY-MM-DD"
+            'notes': new_event.notes
+        }
+    }), 201
+
+# Endpoint do pobierania wszystkich wydarzeń
+EVENT_LIST_COLUMNS = ('id', 'name', 'date', 'notes', 'car_chassis_numbers', 'car_ids')
+
+
+@bp.route('/get-events', methods=['GET'])
+@conditional_get
+@cached_get
+def get_events():
+    try:
+        fmt = requested_format()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    events = Event.query.all()
+    event_list = []
+    
+    for event in events:
+        # Pobieramy wszystkie numery nadwozi powiązanych z danym wydarzeniem
+        car_chassis_numbers = [car.chassis_number for car in event.cars]
+        
+        event_data = {
+            'id': event.id,
+            'name': event.name,
+            'date': event.date,
+            'notes': event.notes,
+            'car_chassis_numbers': car_chassis_numbers,  # Lista numerów nadwozi
+            'car_ids': [car.id for car in event.cars]  # Lista ID samochodów
+        }
+        
+        event_list.append(event_data)
+
+    return jsonify({'events': format_records(event_list, EVENT_LIST_COLUMNS, fmt)})
+
+# Endpoint do pobierania pojedynczego wydarzenia
+@bp.route('/get-event/<int:id>', methods=['GET'])
+@cached_get
+def get_event(id):
+    # Pobieramy wydarzenie o podanym ID
+    event = Event.query.get_or_404(id)
+    
+    # Pobieramy numery nadwozi powiązane z tym wydarzeniem
+    car_chassis_numbers = [car.chassis_number for car in event.cars]
+    
+    # Przygotowujemy dane do zwrócenia
+    event_data = {
+        'id': event.id,
+        'name': event.name,
+        'date': event.date,
+        'notes': event.notes,
+        'car_chassis_numbers': car_chassis_numbers,  # Lista numerów nadwozi
+    }
+    
+    return jsonify(event_data)
+
+
+
+# Endpoint do aktualizacji wydarzenia
+@bp.route('/update-event/<int:event_id>', methods=['PUT'])
+def update_event(event_id):
+    # Pobieramy wydarzenie z bazy danych lub zwracamy błąd, jeśli nie istnieje
+    event = Event.query.get_or_404(event_id)
+    
+    # Zbieramy dane z żądania
+    data = request.get_json()
+
+    current_app.logger.debug("update-event %s: %s", event_id, data)
+
+    # Sprawdzamy, czy mamy wymagane dane
+    if not data or ('event_name' not in data or 'event_date' not in data):
+        return jsonify({'error': 'Missing required data'}), 400
+
+    # Zaktualizuj nazwę i notatki
+    event.name = data['event_name']
+    event.notes = data.get('notes', event.notes)  # Pozwalamy na aktualizację tylko jeśli 'notes' jest przesłane
+
+    # Jeśli data została przesłana, sprawdzamy jej format i aktualizujemy
+    try:
+        event.date = date.fromisoformat(data['event_date'])  # Konwersja stringa "YYYY-MM-DD" na date
+    except ValueError:
+        current_app.logger.warning("update-event %s: invalid date %r", event_id, data['event_date'])
+        return jsonify({'error': 'Invalid date format, expected YYYY-MM-DD'}), 400
+
+    # Zapisz zmiany w bazie danych
+    try:
+        db.session.commit()
+    except Exception:
+        current_app.logger.exception("update-event %s: commit failed", event_id)
+        return jsonify({'error': 'Database commit failed'}), 500
+
+    current_app.logger.info("Event %s updated: %s, %s", event.id, event.name, event.date)
+
+    return jsonify({
+        'message': 'Event updated successfully!',
+        'event': {
+            'id': event.id,
+            'name': event.name,
+            'date': event.date.isoformat(),  # Zapewniamy poprawne zwracanie daty jako string "YYYY-MM-DD"
+            'notes': event.notes
+        }
+    }), 200
+
+
+# Endpoint do usuwania wydarzenia
+@bp.route('/delete-event/<int:event_id>', methods=['DELETE'])  
+def delete_event(event_id):
+    event = Event.query.get_or_404(event_id)  # Znajdź wydarzenie na podstawie ID
+
+    # Usuń wydarzenie z bazy danych
+    db.session.delete(event)
+    db.session.commit()
+
+    return jsonify({'message': 'Event deleted successfully!', 'event_id': event_id}), 200
+
+# Endpoint do przypisywania samochodu do wydarzenia
+@bp.route('/add-car-to-event', methods=['POST'])
+def add_car_to_event():
+    data = request.get_json()
+
+    # Sprawdzamy czy wszystkie wymagane dane są przesłane
+    if 'event_id' not in data or 'car_id' not in data:
+        return jsonify({'error': 'Missing event_id or car_id'}), 400
+
+    event = Event.query.get(data['event_id'])
+    car = Car.query.get(data['car_id'])
+
+    if not event or not car:
+        return jsonify({'error': 'Event or Car not found'}), 404
+
+    # Przypisujemy samochód do wydarzenia
+    event.cars.append(car)
+    db.session.commit()
+
+    return jsonify({'message': 'Car added to event successfully'}), 201
+
+
+# Endpoint do usuwania samochodu z wydarzenia
+@bp.route('/remove-car-from-event', methods=['DELETE'])
+
+def remove_car_from_event():
+    data = request.get_json()
+    if not data or 'car_id' not in data or 'event_id' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    car = Car.query.get(data['car_id'])
+    event = Event.query.get(data['event_id'])
+
+    if not car or not event:
+        return jsonify({'error': 'Car or event not found'}), 404
+
+    event.cars.remove(car)
+    db.session.commit()
+
+    return jsonify({'message': 'Car removed from event successfully!', 'car_id': car.id, 'event_id': event.id}), 200
+
+# Endpoint do pobierania samochodów przypisanych do wydarzenia
+@bp.route('/get-cars-for-event/<int:event_id>', methods=['GET'])
+@cached_get
+def get_cars_for_event(event_id):
+    event = Event.query.get_or_404(event_id)
+    cars = event.cars
+
+    car_list = [{'id': car.id, 'chassis_number': car.chassis_number, 'driver': car.driver} for car in cars]
+    return jsonify({'cars': car_list})
+
+# Endpoint do pobierania wydarzeń dla danego samochodu
+@bp.route('/get-events-for-car/<int:car_id>', methods=['GET'])
+@cached_get
+def get_events_for_car(car_id):
+    car = Car.query.get_or_404(car_id)
+    events = car.events
+
+    event_list = [{'id': event.id, 'name': event.name, 'date': event.date, 'notes': event.notes} for event in events]
+    return jsonify({'events': event_list})
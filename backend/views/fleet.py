@@ -0,0 +1,305 @@
+# Stan floty na wybraną chwilę (/as-of) i punkty kontrolne stanu floty
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from sqlalchemy import bindparam, text
+
+from extensions import db
+from models import (
+    ChangeTombstone, DeletedPart, DeletedPartChange, Event, FleetSnapshot, FleetSnapshotPart, MileageEntry, Part,
+    PartHistory, PartHistoryArchive,
+)
+from responses import cached_get
+from views.transfer import parse_export_bound
+
+
+bp = Blueprint('fleet', __name__)
+
+
+# Stan floty na wybraną chwilę (as-of): przypisanie części do aut i ich przebieg.
+# Punkt startowy to najbliższy wcześniejszy punkt kontrolny (fleet_snapshot); do niego dokładamy
+# ostatnią zmianę przebiegu (rejestr przebiegu) i ostatnie przeniesienie (historia części) każdej
+# części z okresu od punktu do wybranej chwili. Części dodane po punkcie kontrolnym (bez punktu -
+# wszystkie) odtwarzamy wstecz od stanu bieżącego: wartość sprzed pierwszej zmiany po wybranej chwili. Części usunięte
+# w tym okresie (change_tombstone) znikają z wyniku, a usunięte później odtwarzamy tak samo wstecz,
+# od ich stanu z chwili usunięcia (deleted_part, deleted_parts.py).
+AS_OF_CHUNK_SIZE = 500
+# Bez INDEXED BY SQLite wybiera indeks (changed_field, timestamp) i czyta wszystkie przeniesienia floty
+# po wybranej chwili zamiast historii wskazanych części
+FIRST_CAR_MOVES_QUERY = (
+    "SELECT part_id, timestamp, id, old_value, new_value "
+    "FROM {table} INDEXED BY ix_{table}_part_id_timestamp "
+    "WHERE part_id IN :ids AND timestamp >= :start AND changed_field = 'car_id'"
+)
+SNAPSHOT_PART_COLUMNS = ['snapshot_id', 'part_id', 'car_id', 'mileage', 'name', 'part_number', 'part_type_id']
+
+
+def take_fleet_snapshot():
+    snapshot = FleetSnapshot(taken_at=datetime.utcnow())
+    db.session.add(snapshot)
+    db.session.flush()
+    db.session.execute(
+        db.insert(FleetSnapshotPart.__table__).from_select(
+            SNAPSHOT_PART_COLUMNS,
+            db.select(
+                db.literal(snapshot.id),
+                Part.id,
+                Part.car_id,
+                Part.mileage,
+                Part.name,
+                Part.part_number,
+                Part.part_type_id
+            )
+        )
+    )
+    snapshot.part_count = db.session.scalar(
+        db.select(db.func.count()).select_from(FleetSnapshotPart).where(FleetSnapshotPart.snapshot_id == snapshot.id)
+    )
+    return snapshot
+
+
+def latest_mileage_entries(start, end):
+    # Ostatni wpis rejestru każdej części w przedziale [start, end) - wyszukiwanie zakresem po indeksie
+    # po czasie; wybór ostatniego wpisu w Pythonie, bo GROUP BY part_id skłania SQLite do skanu
+    # indeksu (part_id, timestamp) całego rejestru
+    mileages = {}
+    rows = db.session.execute(
+        db.select(MileageEntry.id, MileageEntry.part_id, MileageEntry.odometer)
+        .where(MileageEntry.timestamp >= start, MileageEntry.timestamp < end)
+    )
+    for row in rows:
+        current = mileages.get(row.part_id)
+        if current is None or row.id > current[0]:
+            mileages[row.part_id] = (row.id, row.odometer)
+    return {part_id: odometer for part_id, (_, odometer) in mileages.items()}
+
+
+def first_mileage_entries(part_ids, start):
+    # Przebieg sprzed pierwszej zmiany od chwili start (odometer - delta pierwszego wpisu),
+    # tylko dla wskazanych części - każda paczka to wyszukiwanie po indeksie (part_id, timestamp)
+    part_ids = list(part_ids)
+    mileages = {}
+    for offset in range(0, len(part_ids), AS_OF_CHUNK_SIZE):
+        query = db.select(
+            MileageEntry.part_id,
+            MileageEntry.odometer,
+            MileageEntry.delta,
+            db.func.min(MileageEntry.id)
+        ).where(
+            MileageEntry.part_id.in_(part_ids[offset:offset + AS_OF_CHUNK_SIZE]),
+            MileageEntry.timestamp >= start
+        ).group_by(MileageEntry.part_id)
+        mileages.update({row.part_id: row.odometer - row.delta for row in db.session.execute(query)})
+    return mileages
+
+
+def keep_move(moves, part_id, move, latest):
+    current = moves.get(part_id)
+    if current is None or (move > current if latest else move < current):
+        moves[part_id] = move
+
+
+def car_moves(start, end):
+    # Ostatnie przeniesienie każdej części w przedziale [start, end), z historii bieżącej i archiwum:
+    # {part_id: (timestamp, id, stare auto, nowe auto)} - wyszukiwanie po indeksie (changed_field, timestamp)
+    moves = {}
+    for model in (PartHistoryArchive, PartHistory):
+        rows = db.session.execute(
+            db.select(model.part_id, model.timestamp, model.id, model.old_value, model.new_value)
+            .where(model.changed_field == 'car_id', model.timestamp >= start, model.timestamp < end)
+        )
+        for row in rows:
+            keep_move(moves, row.part_id, (row.timestamp, row.id, row.old_value, row.new_value), latest=True)
+    return moves
+
+
+def first_car_moves(part_ids, start):
+    # Pierwsze przeniesienie wskazanych części od chwili start - paczki wyszukiwane po indeksie
+    # (part_id, timestamp) historii bieżącej i archiwum
+    part_ids = list(part_ids)
+    moves = {}
+    for model in (PartHistoryArchive, PartHistory):
+        query = text(FIRST_CAR_MOVES_QUERY.format(table=model.__table__.name)).bindparams(
+            bindparam('ids', expanding=True),
+            bindparam('start', type_=db.DateTime)
+        ).columns(timestamp=db.DateTime)
+        for offset in range(0, len(part_ids), AS_OF_CHUNK_SIZE):
+            rows = db.session.execute(query, {'ids': part_ids[offset:offset + AS_OF_CHUNK_SIZE], 'start': start})
+            for row in rows:
+                keep_move(moves, row.part_id, (row.timestamp, row.id, row.old_value, row.new_value), latest=False)
+    return moves
+
+
+def history_car_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def deleted_part_ids(start, end):
+    # Części usunięte w przedziale [start, end) - wyszukiwanie po indeksie (kind, deleted_at)
+    return set(db.session.scalars(
+        db.select(ChangeTombstone.ref_id).where(
+            ChangeTombstone.kind == 'parts',
+            ChangeTombstone.deleted_at >= start,
+            ChangeTombstone.deleted_at < end
+        )
+    ))
+
+
+def parts_deleted_after(until):
+    # Części istniejące w chwili until i usunięte później: stan z chwili usunięcia, cofnięty o zmiany
+    # od until (wartość sprzed pierwszej zmiany przebiegu i pierwszego przeniesienia po tej chwili)
+    deletions = db.session.execute(
+        db.select(DeletedPart)
+        .where(
+            DeletedPart.deleted_at >= until,
+            db.or_(DeletedPart.created_at.is_(None), DeletedPart.created_at < until)
+        )
+    ).scalars().all()
+    parts = {
+        deletion.id: {
+            'part_id': deletion.part_id,
+            'name': deletion.name,
+            'part_number': deletion.part_number,
+            'part_type_id': deletion.part_type_id,
+            'car_id': deletion.car_id,
+            'mileage': deletion.mileage
+        }
+        for deletion in deletions
+    }
+
+    deletion_ids = list(parts)
+    for offset in range(0, len(deletion_ids), AS_OF_CHUNK_SIZE):
+        changes = db.session.execute(
+            db.select(
+                DeletedPartChange.deletion_id,
+                DeletedPartChange.changed_field,
+                DeletedPartChange.old_value
+            )
+            .where(
+                DeletedPartChange.deletion_id.in_(deletion_ids[offset:offset + AS_OF_CHUNK_SIZE]),
+                DeletedPartChange.timestamp >= until
+            )
+            .order_by(DeletedPartChange.deletion_id, DeletedPartChange.timestamp.desc(), DeletedPartChange.id.desc())
+        )
+        # Od najpóźniejszej zmiany - ostatnie przypisanie zostawia wartość sprzed pierwszej zmiany
+        for change in changes:
+            part = parts[change.deletion_id]
+            if change.changed_field == 'mileage':
+                part['mileage'] = int(change.old_value)
+            else:
+                part['car_id'] = history_car_id(change.old_value)
+    return {part['part_id']: part for part in parts.values()}
+
+
+def reconstruct_fleet(until):
+    # Stan floty tuż przed chwilą until: {part_id: {...}} i użyty punkt kontrolny (albo None)
+    snapshot = db.session.execute(
+        db.select(FleetSnapshot.id, FleetSnapshot.taken_at)
+        .where(FleetSnapshot.taken_at < until)
+        .order_by(FleetSnapshot.taken_at.desc())
+        .limit(1)
+    ).first()
+
+    parts = {}
+    start = None
+    if snapshot is not None:
+        start = snapshot.taken_at
+        rows = db.session.execute(
+            db.select(FleetSnapshotPart).where(FleetSnapshotPart.snapshot_id == snapshot.id)
+        ).scalars()
+        for row in rows:
+            parts[row.part_id] = {
+                'part_id': row.part_id,
+                'name': row.name,
+                'part_number': row.part_number,
+                'part_type_id': row.part_type_id,
+                'car_id': row.car_id,
+                'mileage': row.mileage
+            }
+        for part_id in deleted_part_ids(start, until):
+            parts.pop(part_id, None)
+
+    # Części istniejące w chwili until, których nie ma w punkcie kontrolnym - startujemy od stanu bieżącego
+    added = {}
+    current = db.session.execute(
+        db.select(Part.id, Part.name, Part.part_number, Part.part_type_id, Part.car_id, Part.mileage)
+        .where(db.or_(Part.created_at.is_(None), Part.created_at < until))
+    )
+    for row in current:
+        if row.id not in parts:
+            added[row.id] = {
+                'part_id': row.id,
+                'name': row.name,
+                'part_number': row.part_number,
+                'part_type_id': row.part_type_id,
+                'car_id': row.car_id,
+                'mileage': row.mileage
+            }
+
+    # Zmiany z okresu [start, until) tylko od punktu kontrolnego - bez niego wszystkie części
+    # odtwarzamy wstecz od stanu bieżącego, nie czytając całego rejestru sprzed until
+    mileages = latest_mileage_entries(start, until) if start is not None else {}
+    moves = car_moves(start, until) if start is not None else {}
+    if added:
+        # Dla nowych części bez zmian przed until cofamy się od stanu bieżącego
+        earlier_mileages = first_mileage_entries(added, until)
+        later_moves = first_car_moves(added, until)
+        for part_id, part in added.items():
+            if part_id not in mileages and part_id in earlier_mileages:
+                part['mileage'] = earlier_mileages[part_id]
+            if part_id not in moves and part_id in later_moves:
+                part['car_id'] = history_car_id(later_moves[part_id][2])
+        parts.update(added)
+
+    for part_id, part in parts.items():
+        if part_id in mileages:
+            part['mileage'] = mileages[part_id]
+        if part_id in moves:
+            part['car_id'] = history_car_id(moves[part_id][3])
+
+    # Rejestr i historia usuniętych części zniknęły razem z nimi - ich stan pochodzi z deleted_part
+    deleted = parts_deleted_after(until)
+    parts.update(deleted)
+
+    return parts, snapshot, {'mileage_entries': len(mileages), 'car_moves': len(moves), 'deleted_parts': len(deleted)}
+
+
+# Endpoint ze stanem floty na wybraną chwilę: ?at=<data lub znacznik czasu ISO> albo ?event_id=<id>
+# (stan na koniec dnia wydarzenia); opcjonalnie car_id zawęża wynik do jednego auta
+@bp.route('/as-of', methods=['GET'])
+@cached_get
+def fleet_as_of():
+    event_id = request.args.get('event_id', type=int)
+    at = request.args.get('at')
+    if event_id is not None:
+        event = db.session.get(Event, event_id)
+        if not event:
+            return jsonify({'error': 'Event not found'}), 404
+        at = event.date.isoformat()
+    if not at:
+        return jsonify({'error': 'Missing at or event_id'}), 400
+    try:
+        until = parse_export_bound(at, end=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format, expected ISO 8601'}), 400
+    car_id = request.args.get('car_id', type=int)
+
+    parts, snapshot, replayed = reconstruct_fleet(until)
+
+    cars = {}
+    for part in sorted(parts.values(), key=lambda part: part['part_id']):
+        if part['car_id'] is None or (car_id is not None and part['car_id'] != car_id):
+            continue
+        cars.setdefault(part['car_id'], []).append(
+            {key: value for key, value in part.items() if key != 'car_id'}
+        )
+
+    return jsonify({
+        'at': at,
+        'checkpoint': {'id': snapshot.id, 'taken_at': snapshot.taken_at.isoformat()} if snapshot else None,
+        'replayed': replayed,
+        'cars': [{'car_id': key, 'parts': cars[key]} for key in sorted(cars)]
+    }), 200
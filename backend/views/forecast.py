@@ -0,0 +1,156 @@
+# Endpointy prognozy zużycia części i planera sezonu (obliczenia w forecast.py, NumPy)
+from flask import Blueprint, jsonify, request
+
+from extensions import db, wear_forecast
+from forecast import forecast_available, plan_season
+from models import car_event, Event, Part, PartType
+from storage import READER_BIND
+
+
+bp = Blueprint('forecast', __name__)
+
+
+# Prognoza wyczerpania części (data, po której przebieg przekroczy limit typu części).
+# Bez cached_get: wynik zależy od bieżącej daty, a nie tylko od wersji danych - tempo zużycia
+# i tak trzyma WearForecast, przeliczając je po zmianach przebiegu i po zmianie dnia.
+@bp.route('/forecast/parts', methods=['GET'])
+def get_parts_forecast():
+    if not forecast_available():
+        return jsonify({'error': 'Forecast requires NumPy'}), 503
+    car_id = request.args.get('car_id', type=int)
+    parts = wear_forecast.parts(db.session.connection(), car_id=car_id)
+    return jsonify({'parts': parts, 'recomputed_parts': wear_forecast.last_recomputed}), 200
+
+
+# Prognoza dla samochodów: najbliższa wymiana części każdego auta
+@bp.route('/forecast/cars', methods=['GET'])
+def get_cars_forecast():
+    if not forecast_available():
+        return jsonify({'error': 'Forecast requires NumPy'}), 503
+    cars = wear_forecast.cars(db.session.connection())
+    return jsonify({'cars': cars, 'recomputed_parts': wear_forecast.last_recomputed}), 200
+
+
+# Planer sezonu "co jeśli": dla listy nadchodzących wydarzeń z przewidywanym dystansem każdego auta
+# symuluje przebieg wszystkich części i zwraca, które części trzeba wymienić przed którym wydarzeniem
+# oraz ile części zamiennych każdego typu potrzeba. Obliczenia wektorowe (auta × części × wydarzenia).
+SEASON_MAX_EVENTS = 200
+
+
+def season_distances(specs, car_ids, connection):
+    # Macierz dystansów (auta × wydarzenia) i opisy wydarzeń; rzuca ValueError przy błędnych danych
+    car_index = {car_id: i for i, car_id in enumerate(car_ids)}
+    distances = [[0] * len(specs) for _ in car_ids]
+    events = []
+    for number, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            raise ValueError('Each event must be an object')
+        try:
+            default = int(spec.get('distance', 0))
+        except (ValueError, TypeError):
+            raise ValueError('Distance must be a number')
+        if default < 0:
+            raise ValueError('Distance cannot be negative')
+
+        event_id = spec.get('event_id')
+        info = {'event_id': event_id, 'name': spec.get('name'), 'date': spec.get('date')}
+        if event_id is not None:
+            event = connection.execute(
+                db.select(Event.name, Event.date).where(Event.id == event_id)
+            ).first()
+            if event is None:
+                raise ValueError(f'Event {event_id} not found')
+            info['name'] = info['name'] or event.name
+            info['date'] = info['date'] or event.date.isoformat()
+            # Domyślnie jadą samochody zgłoszone do wydarzenia
+            participants = connection.execute(
+                db.select(car_event.c.car_id).where(car_event.c.event_id == event_id)
+            ).scalars().all()
+        else:
+            participants = car_ids
+        for car_id in participants:
+            if car_id in car_index:
+                distances[car_index[car_id]][number] = default
+
+        cars = spec.get('cars', [])
+        if not isinstance(cars, list) or not all(isinstance(car_data, dict) for car_data in cars):
+            raise ValueError('cars must be a list of objects')
+        for car_data in cars:
+            car_id = car_data.get('car_id')
+            try:
+                distance = int(car_data.get('distance'))
+            except (ValueError, TypeError):
+                raise ValueError('Distance must be a number')
+            if distance < 0:
+                raise ValueError('Distance cannot be negative')
+            if car_id in car_index:
+                distances[car_index[car_id]][number] = distance
+        events.append(info)
+    return distances, events
+
+
+@bp.route('/forecast/season', methods=['POST'])
+def plan_season_endpoint():
+    if not forecast_available():
+        return jsonify({'error': 'Forecast requires NumPy'}), 503
+    data = request.get_json()
+    if not data or not isinstance(data.get('events'), list) or not data['events']:
+        return jsonify({'error': 'Missing required data'}), 400
+    if len(data['events']) > SEASON_MAX_EVENTS:
+        return jsonify({'error': f'At most {SEASON_MAX_EVENTS} events can be planned'}), 400
+
+    # Tylko odczyt - połączenie z puli czytającej, żeby nie blokować zapisów (BEGIN IMMEDIATE)
+    with db.engines[READER_BIND].connect() as connection:
+        parts = connection.execute(
+            db.select(
+                Part.id,
+                Part.name,
+                Part.car_id,
+                Part.mileage,
+                Part.part_type_id,
+                PartType.name.label('part_type_name'),
+                PartType.max_mileage
+            )
+            .join(PartType, Part.part_type_id == PartType.id)
+            .where(PartType.max_mileage > 0)
+            .order_by(Part.id)
+        ).all()
+        car_ids = sorted({part.car_id for part in parts})
+        try:
+            distances, events = season_distances(data['events'], car_ids, connection)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    car_index = {car_id: i for i, car_id in enumerate(car_ids)}
+    part_indexes, event_indexes, used = plan_season(
+        [car_index[part.car_id] for part in parts],
+        [part.mileage for part in parts],
+        [part.max_mileage for part in parts],
+        distances
+    )
+
+    schedule = [dict(event, replacements=[]) for event in events]
+    spares = {}
+    for part_index, event_index, mileage in sorted(zip(part_indexes.tolist(), event_indexes.tolist(), used.tolist()),
+                                                   key=lambda item: (item[1], item[0])):
+        part = parts[part_index]
+        schedule[event_index]['replacements'].append({
+            'part_id': part.id,
+            'name': part.name,
+            'car_id': part.car_id,
+            'part_type_id': part.part_type_id,
+            'mileage_at_replacement': int(mileage)
+        })
+        spare = spares.setdefault(part.part_type_id, {
+            'part_type_id': part.part_type_id,
+            'name': part.part_type_name,
+            'count': 0
+        })
+        spare['count'] += 1
+
+    return jsonify({
+        'schedule': schedule,
+        'spares': sorted(spares.values(), key=lambda spare: spare['part_type_id']),
+        'total_replacements': len(part_indexes),
+        'season_distance': {car_id: sum(distances[i]) for car_id, i in car_index.items()}
+    }), 200
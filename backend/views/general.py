@@ -0,0 +1,100 @@
+# Endpointy ogólne: strona główna, wyszukiwanie pełnotekstowe, kanał zmian i statystyki pamięci podręcznej
+from flask import Blueprint, jsonify, request
+
+from changes import CHANGE_SOURCES
+from extensions import db, read_cache
+from models import Car, car_event, ChangeTombstone, current_data_version, Event, Part, PartType
+from responses import cached_get
+from search import search_index, SEARCH_KINDS
+
+
+bp = Blueprint('general', __name__)
+
+
+# Endpointy
+@bp.route('/')
+def home():
+    return "Welcome to the Car Parts Management API!"
+
+# Endpoint wyszukiwania pełnotekstowego po częściach, samochodach, wydarzeniach i historii
+@bp.route('/search', methods=['GET'])
+def search():
+    phrase = request.args.get('q', '').strip()
+    if not phrase:
+        return jsonify({'error': 'Missing search query'}), 400
+
+    kinds = [kind for kind in request.args.get('kind', '').split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in SEARCH_KINDS]
+    if unknown:
+        return jsonify({'error': f"Unknown kind: {', '.join(unknown)}"}), 400
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+    except ValueError:
+        return jsonify({'error': 'Limit must be a number'}), 400
+
+    results = search_index(db.session.connection(), phrase, kinds=kinds, limit=limit)
+    return jsonify({'query': phrase, 'results': results})
+
+# Kanał zmian do synchronizacji przyrostowej: wiersze zapisane i usunięte po wersji "since".
+# Bez "since" zwraca pełny stan (pierwsza synchronizacja). Zwrócony "cursor" to wersja danych,
+# którą klient podaje jako "since" w kolejnym wywołaniu. Odczyt w jednej transakcji (migawka WAL),
+# więc kursor zgadza się z danymi.
+CHANGE_FEED_COLUMNS = {
+    'cars': lambda: (Car.id, Car.chassis_number, Car.driver),
+    'parts': lambda: (Part.id, Part.name, Part.mileage, Part.part_number, Part.notes, Part.car_id, Part.part_type_id),
+    'part_types': lambda: (PartType.id, PartType.name, PartType.max_mileage),
+    'events': lambda: (Event.id, Event.name, Event.date, Event.notes),
+    'assignments': lambda: (car_event.c.car_id, car_event.c.event_id),
+}
+
+
+@bp.route('/changes', methods=['GET'])
+@cached_get
+def get_changes():
+    since = request.args.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'since must be a cursor returned by /changes'}), 400
+
+    cursor, _ = current_data_version()
+    changes, deleted = {}, {}
+    for kind in CHANGE_SOURCES:
+        columns = CHANGE_FEED_COLUMNS[kind]()
+        query = db.select(*columns)
+        if since is not None:
+            query = query.where(columns[0].table.c.change_version > since)
+        changes[kind] = [dict(row) for row in db.session.execute(query).mappings()]
+        deleted[kind] = []
+
+    if since is not None:
+        tombstones = db.session.execute(
+            db.select(ChangeTombstone.kind, ChangeTombstone.ref_id, ChangeTombstone.ref_id2)
+            .where(ChangeTombstone.change_version > since)
+            .order_by(ChangeTombstone.change_version, ChangeTombstone.id)
+        )
+        # Identyfikator usunięty i użyty ponownie przez nowy wiersz - obowiązuje nowy wiersz;
+        # wielokrotne usunięcie tego samego klucza zgłaszamy raz
+        seen = {
+            kind: {(row['car_id'], row['event_id']) if kind == 'assignments' else row['id'] for row in rows}
+            for kind, rows in changes.items()
+        }
+        for row in tombstones:
+            key = (row.ref_id, row.ref_id2) if row.kind == 'assignments' else row.ref_id
+            if key in seen[row.kind]:
+                continue
+            seen[row.kind].add(key)
+            if row.kind == 'assignments':
+                deleted[row.kind].append({'car_id': row.ref_id, 'event_id': row.ref_id2})
+            else:
+                deleted[row.kind].append(row.ref_id)
+
+    return jsonify({'cursor': cursor, 'full': since is None, 'changes': changes, 'deleted': deleted}), 200
+
+
+# Endpoint ze statystykami pamięci podręcznej odczytów (do strojenia rozmiaru)
+@bp.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify(read_cache.stats())
@@ -0,0 +1,253 @@
+# Endpointy historii części i samochodów oraz kompaktowanie i archiwizacja historii
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from extensions import db
+from models import Car, CarHistory, CarHistoryArchive, PartHistory, PartHistoryArchive
+from responses import format_records, requested_format
+from views.parts import decode_cursor, encode_cursor
+from views.transfer import export_value, parse_export_bound
+
+
+bp = Blueprint('history', __name__)
+
+
+# Stronicowanie historii kluczem (timestamp, id) - domyślnie od najnowszych wpisów.
+# Zwraca (zapytanie, limit, kolejność) albo rzuca ValueError z opisem błędnego parametru.
+HISTORY_DEFAULT_LIMIT = 50
+HISTORY_MAX_LIMIT = 500
+
+
+def history_page_query(model, query):
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise ValueError('Order must be asc or desc')
+
+    try:
+        limit = int(request.args.get('limit', HISTORY_DEFAULT_LIMIT))
+    except ValueError:
+        raise ValueError('Limit must be a number')
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
+
+    try:
+        since = parse_export_bound(request.args.get('since'))
+        until = parse_export_bound(request.args.get('until'), end=True)
+    except ValueError:
+        raise ValueError('Invalid date format, expected ISO 8601')
+    if since is not None:
+        query = query.where(model.timestamp >= since)
+    if until is not None:
+        query = query.where(model.timestamp < until)
+
+    changed_field = request.args.get('changed_field')
+    if changed_field:
+        query = query.where(model.changed_field == changed_field)
+
+    # Wpisy bez daty (sprzed domyślnej wartości timestamp) nie mają miejsca w porządku (timestamp, id):
+    # porównanie krotki z NULL nie przepuściłoby ich przez kursor, a sortowanie w Pythonie by się wywróciło
+    query = query.where(model.timestamp.is_not(None))
+
+    key = db.tuple_(model.timestamp, model.id)
+    cursor = request.args.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            last = db.tuple_(db.literal(datetime.fromisoformat(values[0]), db.DateTime), db.literal(int(values[1])))
+        except (TypeError, ValueError, IndexError):
+            raise ValueError('Invalid cursor')
+        query = query.where(key > last if order == 'asc' else key < last)
+
+    if order == 'asc':
+        query = query.order_by(model.timestamp.asc(), model.id.asc())
+    else:
+        query = query.order_by(model.timestamp.desc(), model.id.desc())
+    return query.limit(limit + 1), limit, order
+
+
+def history_page(*sources):
+    # sources: pary (model, zapytanie) - historia bieżąca i archiwum; każda tabela zwraca
+    # co najwyżej limit + 1 wierszy ze swojego indeksu, a strony scalamy w Pythonie
+    rows = []
+    for model, query in sources:
+        query, limit, order = history_page_query(model, query)
+        rows.extend(db.session.execute(query).mappings().all())
+    rows.sort(key=lambda row: (row['timestamp'], row['id']), reverse=(order == 'desc'))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([export_value(rows[-1]['timestamp']), rows[-1]['id']])
+    return rows, next_cursor
+
+
+# Endpoint do pobierania historii edycji części
+PART_HISTORY_COLUMNS = ('id', 'timestamp', 'changed_field', 'old_value', 'new_value', 'notes')
+CAR_HISTORY_COLUMNS = ('id', 'timestamp', 'changed_field', 'old_value', 'new_value')
+
+
+@bp.route('/part-history/<int:part_id>', methods=['GET'])
+def get_part_history(part_id):
+    sources = [(model, db.select(
+        model.id,
+        model.timestamp,
+        model.changed_field,
+        model.old_value,
+        model.new_value,
+        model.notes
+    ).where(model.part_id == part_id)) for model in (PartHistory, PartHistoryArchive)]
+
+    try:
+        fmt = requested_format()
+        history, next_cursor = history_page(*sources)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Jeśli część nie ma żadnej historii, zwróć odpowiednią wiadomość
+    if not history and not request.args:
+        return jsonify({'message': 'No history found for this part'}), 404
+
+    # Zwróć historię w formacie JSON
+    history_data = [{
+        'id': record['id'],
+        'timestamp': record['timestamp'],
+        'changed_field': record['changed_field'],
+        'old_value': record['old_value'],
+        'new_value': record['new_value'],
+        'notes': record['notes'],
+    } for record in history]
+
+    return jsonify({'history': format_records(history_data, PART_HISTORY_COLUMNS, fmt), 'next_cursor': next_cursor}), 200
+
+#Endpoint do usuwania historii edycji części
+@bp.route('/delete-part-history/<int:part_id>', methods=['DELETE'])
+def delete_part_history(part_id):
+    # Usunięcie wszystkich rekordów historii dla danej części (również zarchiwizowanych)
+    deleted = 0
+    for model in (PartHistory, PartHistoryArchive):
+        deleted += db.session.execute(db.delete(model).where(model.part_id == part_id)).rowcount
+
+    if not deleted:
+        db.session.rollback()
+        return jsonify({'error': 'No history found for this part'}), 404
+
+    db.session.commit()
+    
+    return jsonify({'message': f'History for part {part_id} deleted successfully'}), 200
+
+
+def car_history_sources(car_id):
+    return [(model, db.select(
+        model.id,
+        model.timestamp,
+        model.changed_field,
+        model.old_value,
+        model.new_value
+    ).where(model.car_id == car_id)) for model in (CarHistory, CarHistoryArchive)]
+
+
+# Endpoint do pobierania historii edycji samochodu
+@bp.route('/car-history/<int:car_id>', methods=['GET'])
+def get_car_history(car_id):
+    car = Car.query.get_or_404(car_id)
+    try:
+        fmt = requested_format()
+        history, next_cursor = history_page(*car_history_sources(car.id))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    history_data = [{
+        'id': record['id'],
+        'timestamp': record['timestamp'],
+        'changed_field': record['changed_field'],
+        'old_value': record['old_value'],
+        'new_value': record['new_value']
+    } for record in history]
+
+    return jsonify({'history': format_records(history_data, CAR_HISTORY_COLUMNS, fmt), 'next_cursor': next_cursor})
+
+
+# Kompaktowanie i archiwizacja historii.
+# Kolejne wpisy przebiegu tej samej części z jednego dnia (bez innych zmian pomiędzy) są scalane
+# w jeden wpis: stara wartość z pierwszego, nowa z ostatniego, notatki połączone.
+# Wpisy starsze niż horyzont archiwizacji są przenoszone do tabel *_archive w paczkach.
+HISTORY_BATCH_SIZE = 5000
+
+
+def compact_part_mileage_history(part_id, cutoff):
+    # Zwraca liczbę usuniętych (scalonych) wpisów dla jednej części
+    rows = db.session.execute(
+        db.select(
+            PartHistory.id,
+            PartHistory.changed_field,
+            PartHistory.old_value,
+            PartHistory.timestamp,
+            PartHistory.notes
+        )
+        .where(PartHistory.part_id == part_id, PartHistory.timestamp < cutoff)
+        .order_by(PartHistory.timestamp, PartHistory.id)
+    ).all()
+
+    runs, run = [], []
+    for row in rows:
+        if run and (row.changed_field != 'mileage' or row.timestamp.date() != run[-1].timestamp.date()):
+            runs.append(run)
+            run = []
+        if row.changed_field == 'mileage':
+            run.append(row)
+    runs.append(run)
+
+    updates, deleted_ids = [], []
+    for run in runs:
+        if len(run) < 2:
+            continue
+        notes = []
+        for row in run:
+            if row.notes and row.notes not in notes:
+                notes.append(row.notes)
+        updates.append({'b_id': run[-1].id, 'b_old_value': run[0].old_value, 'b_notes': '; '.join(notes)})
+        deleted_ids.extend(row.id for row in run[:-1])
+
+    if updates:
+        table = PartHistory.__table__
+        db.session.execute(
+            db.update(table).where(table.c.id == db.bindparam('b_id'))
+            .values(old_value=db.bindparam('b_old_value'), notes=db.bindparam('b_notes')),
+            updates
+        )
+        for start in range(0, len(deleted_ids), HISTORY_BATCH_SIZE):
+            db.session.execute(db.delete(table).where(table.c.id.in_(deleted_ids[start:start + HISTORY_BATCH_SIZE])))
+    return len(deleted_ids)
+
+
+def compact_history(cutoff):
+    part_ids = db.session.scalars(
+        db.select(PartHistory.part_id).distinct()
+        .where(PartHistory.changed_field == 'mileage', PartHistory.timestamp < cutoff)
+    ).all()
+
+    removed = 0
+    for part_id in part_ids:
+        removed += compact_part_mileage_history(part_id, cutoff)
+        db.session.commit()  # Krótkie transakcje - zapis nie blokuje bazy na cały czas kompaktowania
+    return removed
+
+
+def archive_history(model, archive_model, horizon):
+    table, archive_table = model.__table__, archive_model.__table__
+    columns = [column.name for column in archive_table.columns]
+    moved = 0
+    while True:
+        ids = db.session.scalars(
+            db.select(table.c.id).where(table.c.timestamp < horizon).limit(HISTORY_BATCH_SIZE)
+        ).all()
+        if not ids:
+            return moved
+        db.session.execute(
+            db.insert(archive_table).from_select(
+                columns, db.select(*[table.c[name] for name in columns]).where(table.c.id.in_(ids))
+            )
+        )
+        db.session.execute(db.delete(table).where(table.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
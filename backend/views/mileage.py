@@ -0,0 +1,198 @@
+# Endpointy przebiegu: aktualizacja, dodawanie (również dla wydarzenia) i raport z rejestru przebiegu
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+
+from extensions import db
+from mileage import add_cars_mileage, add_parts_mileage, set_car_mileage
+from models import car_event, Event, MileageEntry, Part
+from views.transfer import parse_export_bound
+
+
+bp = Blueprint('mileage', __name__)
+
+
+#Endpoint do aktualizacji przebiegu części danego samochodu
+@bp.route('/update-mileage/<int:car_id>', methods=['PUT'])
+def update_mileage(car_id):
+    data = request.get_json()
+
+    # Sprawdź, czy przesłano dane do aktualizacji
+    if not data or 'mileage' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    # Sprawdź, czy mileage jest liczbą
+    try:
+        new_mileage = int(data['mileage'])
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Mileage must be a number'}), 400
+
+    # Zaktualizuj przebieg wszystkich części samochodu w jednej transakcji
+    try:
+        updated = set_car_mileage(car_id, new_mileage, data.get("notes", ""), datetime.utcnow())
+        if not updated:
+            db.session.rollback()
+            return jsonify({'error': 'No parts found for this car'}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update mileage', 'details': str(e)}), 500
+
+    updated_parts = [{'id': part['id'], 'name': part['name'], 'mileage': part['mileage']} for part in updated]
+    return jsonify({'message': 'Mileage updated successfully!', 'updated_parts': updated_parts}), 200
+
+#Endpoint dodatkowy do dodawania przebiegu
+@bp.route('/add-mileage/<int:car_id>', methods=['PUT'])
+def add_mileage(car_id):
+    data = request.get_json()
+
+    # Sprawdź, czy przesłano dane do aktualizacji
+    if not data or 'parts' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    # Sprawdź, czy `parts` jest listą
+    if not isinstance(data['parts'], list):
+        return jsonify({'error': 'Parts must be a list'}), 400
+
+    # Identyfikatory części przypisanych do danego samochodu
+    car_part_ids = set(db.session.scalars(db.select(Part.id).where(Part.car_id == car_id)))
+    if not car_part_ids:
+        return jsonify({'error': 'No parts found for this car'}), 404
+
+    # Zbierz przyrosty przebiegu (powtórzone części sumujemy)
+    deltas = {}
+    for part_data in data['parts']:
+        part_id = part_data.get('part_id')
+
+        # Pomijaj nieistniejące części
+        if part_id not in car_part_ids:
+            continue
+
+        # Pomijaj nieprawidłowe wartości
+        try:
+            mileage_to_add = int(part_data.get('mileage'))
+        except (ValueError, TypeError):
+            continue
+
+        deltas[part_id] = deltas.get(part_id, 0) + mileage_to_add
+
+    updated = []
+    if deltas:
+        try:
+            updated = add_parts_mileage(car_id, deltas, data.get("notes", ""), datetime.utcnow())
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'error': 'Failed to update mileage', 'details': str(e)}), 500
+
+    updated_parts = [{'id': part['id'], 'name': part['name'], 'mileage': part['mileage']} for part in updated]
+    return jsonify({'message': 'Mileage added successfully!', 'updated_parts': updated_parts}), 200
+
+# Endpoint do dodawania przebiegu wszystkim samochodom zgłoszonym do wydarzenia (np. po dniu rajdu)
+@bp.route('/add-mileage-for-event/<int:event_id>', methods=['PUT'])
+def add_mileage_for_event(event_id):
+    data = request.get_json()
+
+    if not data or 'mileage' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    try:
+        default_mileage = int(data['mileage'])
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Mileage must be a number'}), 400
+
+    cars = data.get('cars', [])
+    if not isinstance(cars, list) or not all(isinstance(car_data, dict) for car_data in cars):
+        return jsonify({'error': 'cars must be a list of objects'}), 400
+
+    event = db.session.get(Event, event_id)
+    if not event:
+        return jsonify({'error': 'Event not found'}), 404
+
+    car_ids = db.session.scalars(
+        db.select(car_event.c.car_id).where(car_event.c.event_id == event_id)
+    ).all()
+    if not car_ids:
+        return jsonify({'error': 'No cars assigned to this event'}), 404
+
+    # Domyślny przebieg dla każdego auta, z opcjonalnymi wartościami dla wybranych samochodów
+    deltas = {car_id: default_mileage for car_id in car_ids}
+    for car_data in cars:
+        car_id = car_data.get('car_id')
+        if car_id not in deltas:
+            continue
+        try:
+            deltas[car_id] = int(car_data.get('mileage'))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Mileage must be a number'}), 400
+
+    notes = data.get('notes') or event.name
+    try:
+        updated = add_cars_mileage(deltas, notes, datetime.utcnow(), event_id=event_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update mileage', 'details': str(e)}), 500
+
+    updated_parts = [{
+        'id': part['id'],
+        'car_id': part['car_id'],
+        'name': part['name'],
+        'mileage': part['mileage']
+    } for part in updated]
+    return jsonify({
+        'message': 'Mileage added for event successfully!',
+        'event_id': event_id,
+        'cars': deltas,
+        'updated_parts': updated_parts
+    }), 200
+
+
+# Raport przebiegu z rejestru: suma przejechanych km w grupach (część, auto, wydarzenie, dzień, miesiąc)
+MILEAGE_REPORT_GROUPS = {
+    'part': MileageEntry.part_id,
+    'car': MileageEntry.car_id,
+    'event': MileageEntry.event_id,
+    'day': db.func.strftime('%Y-%m-%d', MileageEntry.timestamp),
+    'month': db.func.strftime('%Y-%m', MileageEntry.timestamp),
+}
+
+
+@bp.route('/mileage-report', methods=['GET'])
+def mileage_report():
+    group_by = request.args.get('group_by', 'part')
+    if group_by not in MILEAGE_REPORT_GROUPS:
+        return jsonify({'error': f"group_by must be one of: {', '.join(MILEAGE_REPORT_GROUPS)}"}), 400
+    try:
+        since = parse_export_bound(request.args.get('since'))
+        until = parse_export_bound(request.args.get('until'), end=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format, expected ISO 8601'}), 400
+
+    key = MILEAGE_REPORT_GROUPS[group_by].label('key')
+    query = (
+        db.select(
+            key,
+            db.func.sum(MileageEntry.delta).label('distance'),
+            db.func.count().label('entries'),
+            db.func.max(MileageEntry.odometer).label('max_odometer')
+        )
+        .group_by(key)
+        .order_by(key)
+    )
+    for name, column in (('part_id', MileageEntry.part_id), ('car_id', MileageEntry.car_id),
+                         ('event_id', MileageEntry.event_id)):
+        value = request.args.get(name, type=int)
+        if value is not None:
+            query = query.where(column == value)
+    if since is not None:
+        query = query.where(MileageEntry.timestamp >= since)
+    if until is not None:
+        query = query.where(MileageEntry.timestamp < until)
+
+    rows = db.session.execute(query).mappings().all()
+    return jsonify({
+        'group_by': group_by,
+        'total_distance': sum(row['distance'] or 0 for row in rows),
+        'groups': [dict(row) for row in rows]
+    }), 200
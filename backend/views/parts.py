@@ -0,0 +1,495 @@
+# Endpointy części i typów części
+import base64
+import json
+from datetime import datetime, timezone
+
+from flask import Blueprint, current_app, jsonify, request
+
+from extensions import db
+from mileage import record_wear_alerts
+from models import Car, CarHistory, MileageEntry, Part, PartHistory, PartType
+from responses import cached_get, conditional_get, format_records, requested_format
+from search import build_match_query, search_index_ids
+
+
+bp = Blueprint('parts', __name__)
+
+
+# Endpointy dla części
+
+@bp.route('/add-part', methods=['POST'])
+def add_part():
+    data = request.get_json()
+    if not data or 'name' not in data or 'mileage' not in data or 'part_number' not in data or 'car_id' not in data or 'part_type_id' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    new_part = Part(
+        name=data['name'],
+        mileage=data['mileage'],
+        part_number=data['part_number'],
+        car_id=data['car_id'],
+        part_type_id=data['part_type_id']
+    )
+    
+    if 'notes' in data:
+        new_part.notes = data['notes']
+
+    db.session.add(new_part)
+    db.session.commit()
+
+    # Dodanie wpisu do historii samochodu
+    new_history_entry = CarHistory(
+        car_id=new_part.car_id,
+        changed_field="part_assigned",
+        old_value=None,  # Brak starej wartości, bo to nowe przypisanie
+        new_value=new_part.name,  # Można wpisać nazwę części lub jej ID
+        timestamp=datetime.utcnow()
+    )
+
+    db.session.add(new_history_entry)
+    db.session.commit()
+
+    return jsonify({'message': 'Part added successfully!', 'part': {'name': new_part.name, 'part_number': new_part.part_number}}), 201
+
+
+# Procent zużycia części liczony w SQL (NULL, gdy typ nie ma limitu przebiegu)
+def usage_percentage_expr():
+    return db.case(
+        (PartType.max_mileage > 0, db.func.round(Part.mileage * 100.0 / PartType.max_mileage, 2)),
+        else_=None
+    )
+
+
+# Zapytanie łączące część z typem części i samochodem - zużycie liczone w SQL
+def parts_with_wear_query():
+    return (
+        db.select(
+            Part.id,
+            Part.name,
+            Part.mileage,
+            Part.part_number,
+            Part.notes,
+            Part.car_id,
+            Car.chassis_number.label('car_chassis_number'),
+            Part.part_type_id,
+            PartType.name.label('part_type_name'),
+            PartType.max_mileage.label('max_mileage'),
+            usage_percentage_expr().label('usage_percentage')
+        )
+        .select_from(Part)
+        .outerjoin(PartType, Part.part_type_id == PartType.id)
+        .outerjoin(Car, Part.car_id == Car.id)
+    )
+
+
+# Kolumny, po których można sortować listę części (NULL zamieniamy na wartość sortowalną)
+PARTS_SORT_COLUMNS = {
+    'id': lambda: Part.id,
+    'name': lambda: Part.name,
+    'part_number': lambda: Part.part_number,
+    'mileage': lambda: Part.mileage,
+    'car_chassis_number': lambda: db.func.coalesce(Car.chassis_number, ''),
+    'usage_percentage': lambda: db.func.coalesce(usage_percentage_expr(), -1),
+}
+PARTS_DEFAULT_LIMIT = 100
+PARTS_MAX_LIMIT = 500
+
+
+# Token strony (kursor) to zakodowana para (wartość sortowania, id ostatniej części)
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(token):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+PARTS_LIST_COLUMNS = (
+    'id', 'name', 'mileage', 'part_number', 'notes', 'car_id', 'car_chassis_number',
+    'part_type_id', 'max_mileage', 'usage_percentage'
+)
+
+
+@bp.route('/get-parts', methods=['GET'])
+@conditional_get
+def get_parts():
+    search = request.args.get('search', '').strip()
+    sort = request.args.get('sort', 'id')
+    order = request.args.get('order', 'asc')
+    cursor = request.args.get('cursor')
+
+    if sort not in PARTS_SORT_COLUMNS:
+        return jsonify({'error': f'Invalid sort column: {sort}'}), 400
+    if order not in ('asc', 'desc'):
+        return jsonify({'error': 'Order must be asc or desc'}), 400
+    try:
+        fmt = requested_format()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        limit = int(request.args.get('limit', PARTS_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'Limit must be a number'}), 400
+    limit = max(1, min(limit, PARTS_MAX_LIMIT))
+
+    sort_key = PARTS_SORT_COLUMNS[sort]()
+    query = parts_with_wear_query().add_columns(sort_key.label('sort_key'))
+
+    # Filtrowanie po nazwie, numerze części i numerze nadwozia - przez indeks FTS5 (search.py),
+    # każde słowo jako prefiks tokenu; fraza bez słów niczego nie dopasowuje
+    if search:
+        match = build_match_query(search)
+        if match:
+            query = query.where(db.or_(
+                Part.id.in_(search_index_ids('part', match, ('title', 'code'))),
+                Part.car_id.in_(search_index_ids('car', match, ('code',)))
+            ))
+        else:
+            query = query.where(db.false())
+
+    # Paginacja kluczem (keyset): kolejna strona zaczyna się za ostatnim wierszem poprzedniej
+    if cursor:
+        values = decode_cursor(cursor)
+        if not values or len(values) != 2:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        last_key = db.tuple_(sort_key, Part.id)
+        last_values = db.tuple_(db.literal(values[0]), db.literal(values[1]))
+        query = query.where(last_key > last_values if order == 'asc' else last_key < last_values)
+
+    if order == 'asc':
+        query = query.order_by(sort_key.asc(), Part.id.asc())
+    else:
+        query = query.order_by(sort_key.desc(), Part.id.desc())
+
+    # Pobieramy jeden wiersz więcej, żeby wiedzieć, czy istnieje następna strona
+    rows = db.session.execute(query.limit(limit + 1)).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]['sort_key'], rows[-1]['id']])
+
+    part_list = [{
+        'id': row['id'],
+        'name': row['name'],
+        'mileage': row['mileage'],
+        'part_number': row['part_number'],
+        'notes': row['notes'],
+        'car_id': row['car_id'],
+        'car_chassis_number': row['car_chassis_number'],
+        'part_type_id': row['part_type_id'],
+        'max_mileage': row['max_mileage'],
+        'usage_percentage': row['usage_percentage']  # Procent zużycia policzony w bazie
+    } for row in rows]
+
+    return jsonify({'parts': format_records(part_list, PARTS_LIST_COLUMNS, fmt), 'next_cursor': next_cursor})
+
+
+# Endpoint z częściami do wymiany przed wydarzeniem: zużycie co najmniej "threshold" procent
+# albo do limitu zostało najwyżej "within" km. Wynik pogrupowany według samochodu i typu części.
+@bp.route('/parts/due', methods=['GET'])
+def get_parts_due():
+    try:
+        threshold = float(request.args.get('threshold', 80))
+        within = int(request.args.get('within', 0))
+    except ValueError:
+        return jsonify({'error': 'threshold and within must be numbers'}), 400
+    car_id = request.args.get('car_id', type=int)
+
+    # Największy pozostały przebieg, przy którym część któregokolwiek typu może być do wymiany -
+    # zawęża wybór do zakresu na indeksie ix_part_remaining_mileage
+    bound = db.session.scalar(
+        db.select(db.func.max(PartType.max_mileage * (1 - threshold / 100.0))).where(PartType.max_mileage > 0)
+    )
+    if bound is None:
+        return jsonify({'threshold': threshold, 'within': within, 'cars': []}), 200
+
+    usage = usage_percentage_expr()
+    query = (
+        db.select(
+            Part.id,
+            Part.name,
+            Part.part_number,
+            Part.mileage,
+            Part.remaining_mileage,
+            usage.label('usage_percentage'),
+            Part.car_id,
+            Car.chassis_number,
+            Car.driver,
+            Part.part_type_id,
+            PartType.name.label('part_type_name'),
+            PartType.max_mileage
+        )
+        .join(PartType, Part.part_type_id == PartType.id)
+        .join(Car, Part.car_id == Car.id)
+        .where(
+            Part.remaining_mileage <= max(bound, within),
+            db.or_(Part.remaining_mileage <= within, usage >= threshold)
+        )
+        .order_by(Car.chassis_number, PartType.name, Part.remaining_mileage, Part.id)
+    )
+    if car_id is not None:
+        query = query.where(Part.car_id == car_id)
+
+    cars = []
+    for row in db.session.execute(query).mappings():
+        if not cars or cars[-1]['car_id'] != row['car_id']:
+            cars.append({
+                'car_id': row['car_id'],
+                'chassis_number': row['chassis_number'],
+                'driver': row['driver'],
+                'part_types': []
+            })
+        part_types = cars[-1]['part_types']
+        if not part_types or part_types[-1]['part_type_id'] != row['part_type_id']:
+            part_types.append({
+                'part_type_id': row['part_type_id'],
+                'name': row['part_type_name'],
+                'max_mileage': row['max_mileage'],
+                'parts': []
+            })
+        part_types[-1]['parts'].append({
+            'id': row['id'],
+            'name': row['name'],
+            'part_number': row['part_number'],
+            'mileage': row['mileage'],
+            'remaining_mileage': row['remaining_mileage'],
+            'usage_percentage': row['usage_percentage']
+        })
+
+    return jsonify({'threshold': threshold, 'within': within, 'cars': cars}), 200
+
+
+# Endpoint do pobierania danych pojedynczej części
+@bp.route("/get-part/<int:part_id>", methods=["GET"])
+def get_part(part_id):
+    part = Part.query.get(part_id)
+    if not part:
+        return jsonify({"error": "Część nie została znaleziona"}), 404
+
+    return jsonify({
+        "part": {
+            "id": part.id,
+            "name": part.name,
+            "part_number": part.part_number,
+            "mileage": part.mileage,
+            "notes": part.notes,
+            "car_id": part.car_id,
+            "part_type_id": part.part_type_id,
+            
+            "car_chassis_number": part.car.chassis_number if part.car else None
+        }
+    }), 200
+
+
+# Endpoint do usuwania części
+@bp.route('/delete-part/<int:part_id>', methods=['DELETE'])
+def delete_part(part_id):
+    part = Part.query.get_or_404(part_id)  # Znajdź część na podstawie ID
+
+    # Usuń część z bazy danych
+    db.session.delete(part)
+    db.session.commit()
+
+    return jsonify({'message': 'Part deleted successfully!', 'part_id': part_id}), 200
+    
+@bp.route('/update-part/<int:part_id>', methods=['PUT'])
+def update_part(part_id):
+    part = Part.query.get_or_404(part_id)
+    data = request.get_json()
+    current_app.logger.debug("update-part %s: %s", part_id, data)
+
+    required_fields = ['name', 'mileage', 'part_number', 'car_id', 'part_type_id']
+    optional_fields = ['notes']
+
+    if not data or any(field not in data for field in required_fields):
+        return jsonify({'error': 'Missing required data'}), 400
+
+    changed_fields = []
+    car_change = None  # Zmienna do przechowywania zmiany auta
+
+    # Aktualizacja wymaganych pól
+    for field in required_fields:
+        if field in data:
+            old_value = getattr(part, field)
+            new_value = data[field]
+
+            if str(old_value) != str(new_value):
+                setattr(part, field, new_value)
+                changed_fields.append((field, old_value, new_value))
+
+                # Jeśli zmienia się car_id, zapisz starą i nową wartość
+                if field == "car_id":
+                    car_change = (old_value, new_value)
+
+    # Aktualizacja opcjonalnych pól
+    for field in optional_fields:
+        if field in data:
+            old_value = getattr(part, field, None)
+            new_value = data[field]
+
+            if str(old_value) != str(new_value):
+                setattr(part, field, new_value)
+                changed_fields.append((field, old_value, new_value))
+
+    # Zapisanie zmian do historii części
+    for field, old, new in changed_fields:
+        history_entry = PartHistory(
+            part_id=part.id,
+            changed_field=field,
+            old_value=str(old) if old is not None else None,
+            new_value=str(new) if new is not None else None,
+            timestamp=datetime.now(timezone.utc)
+        )
+        db.session.add(history_entry)
+
+        # Zmiana przebiegu trafia też do rejestru przebiegu (wartości liczbowe)
+        if field == 'mileage':
+            try:
+                db.session.add(MileageEntry(
+                    part_id=part.id,
+                    car_id=part.car_id,
+                    delta=int(new) - int(old),
+                    odometer=int(new),
+                    timestamp=history_entry.timestamp
+                ))
+                db.session.flush()
+                record_wear_alerts({part.id: (int(old), int(new))}, history_entry.timestamp)
+            except (ValueError, TypeError):
+                pass
+
+    # Jeśli część została przeniesiona do innego auta, zapisujemy to w car_history
+    if car_change:
+        old_car_id, new_car_id = car_change
+        part_name = part.name  # Zmienna przechowująca nazwę części
+        
+        car_history_entry = CarHistory(
+            car_id=new_car_id,
+            changed_field=f"part_moved: {part_name}",
+            old_value=str(old_car_id),  # Stary samochód, do którego część była przypisana
+            new_value=str(new_car_id),  # Nowy samochód
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(car_history_entry)
+
+        # Zapis historii dla starego samochodu (auta, z którego część została zabrana)
+        car_history_entry_old = CarHistory(
+            car_id=old_car_id,
+            changed_field=f"part_moved: {part_name}",
+            old_value=str(old_car_id),  # Nowy samochód, do którego część została przypisana
+            new_value=str(new_car_id),  # Stary samochód
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(car_history_entry_old)
+
+    db.session.commit()
+
+    return jsonify({
+        'message': 'Part updated successfully!',
+        'updated_fields': [{field: {'old': old, 'new': new}} for field, old, new in changed_fields]
+    }), 200
+
+
+#Endpointy dla typów części
+
+# Endpoint do dodawania nowego typu części
+@bp.route('/add-part-type', methods=['POST'])
+def add_part_type():
+    data = request.get_json()
+    if not data or 'name' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    # Tworzymy nowy typ części
+    new_part_type = PartType(name=data['name'])
+    if 'max_mileage' in data:
+        new_part_type.max_mileage = data['max_mileage']
+
+    # Dodajemy do bazy danych
+    db.session.add(new_part_type)
+    db.session.commit()
+
+    return jsonify({'message': 'Part type added successfully!', 'part_type': {'id': new_part_type.id, 'name': new_part_type.name, 'max_mileage': new_part_type.max_mileage}}), 201
+
+# Endpoint do pobierania wszystkich typów części
+@bp.route('/get-part-types', methods=['GET'])
+@conditional_get
+@cached_get
+def get_part_types():
+    part_types = PartType.query.all()
+    part_type_list = [{'id': pt.id, 'name': pt.name, 'max_mileage': pt.max_mileage} for pt in part_types]
+    return jsonify({'part_types': part_type_list})
+
+# Endpoint do pobierania jednego typu części na podstawie ID
+@bp.route('/get-part-type/<int:id>', methods=['GET'])
+@cached_get
+def get_part_type(id):
+    part_type = PartType.query.get(id)  # Pobieramy typ części po ID
+    if part_type:
+        # Jeśli typ części istnieje, zwracamy go w odpowiedzi
+        return jsonify({'id': part_type.id, 'name': part_type.name, 'max_mileage': part_type.max_mileage})
+    else:
+        # Jeśli nie znaleziono typu części o podanym ID, zwracamy błąd
+        return jsonify({'error': 'Typ części nie znaleziony'}), 404
+
+
+# Endpoint do aktualizacji typu części
+@bp.route('/update-part-type/<int:part_type_id>', methods=['PUT'])
+def update_part_type(part_type_id):
+    part_type = PartType.query.get_or_404(part_type_id)  # Znajdź typ części na podstawie ID
+    data = request.get_json()
+
+    # Sprawdź, czy przesłano dane do aktualizacji
+    if not data or 'name' not in data:
+        return jsonify({'error': 'Missing required data'}), 400
+
+    # Zaktualizuj dane typu części
+    part_type.name = data['name']
+    if 'max_mileage' in data:
+        part_type.max_mileage = data['max_mileage']
+
+    db.session.commit()  # Zapisz zmiany w bazie danych
+
+    return jsonify({'message': 'Part type updated successfully!', 'part_type': {'id': part_type.id, 'name': part_type.name, 'max_mileage': part_type.max_mileage}}), 200
+
+# Endpoint do usuwania typu części
+@bp.route('/delete-part-type/<int:part_type_id>', methods=['DELETE'])
+def delete_part_type(part_type_id):
+    part_type = PartType.query.get_or_404(part_type_id)  # Znajdź typ części na podstawie ID
+
+    # Klucz obcy part.part_type_id ma ON DELETE CASCADE - usunięcie używanego typu skasowałoby
+    # wszystkie jego części razem z historią, rejestrem przebiegu i alertami
+    part_count = db.session.scalar(
+        db.select(db.func.count()).select_from(Part).where(Part.part_type_id == part_type_id)
+    )
+    if part_count:
+        return jsonify({'error': f'Part type is used by {part_count} parts', 'part_count': part_count}), 409
+
+    # Usuń typ części z bazy danych
+    db.session.delete(part_type)
+    db.session.commit()
+
+    return jsonify({'message': 'Part type deleted successfully!', 'part_type_id': part_type_id}), 200
+
+@bp.route('/get-parts-for-car/<int:car_id>', methods=['GET'])
+def get_parts_for_car(car_id):
+    # Części przypisane do auta razem z typem części - jedno zapytanie
+    rows = db.session.execute(
+        parts_with_wear_query().where(Part.car_id == car_id)
+    ).mappings()
+
+    part_list = [{
+        'id': row['id'],
+        'name': row['name'],
+        'part_number': row['part_number'],
+        'mileage': row['mileage'],
+        'notes': row['notes'],
+        'part_type_name': row['part_type_name'],
+        'max_mileage': row['max_mileage'],
+        'usage_percentage': row['usage_percentage']
+    } for row in rows]
+
+    return jsonify({'parts': part_list})
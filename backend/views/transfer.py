@@ -0,0 +1,413 @@
+# Eksport i import masowy danych
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from extensions import db
+from models import Car, CarHistory, CarHistoryArchive, Part, PartHistory, PartHistoryArchive, PartType
+from views.parts import parts_with_wear_query
+
+
+bp = Blueprint('transfer', __name__)
+
+
+# Eksport strumieniowy (NDJSON lub CSV) - wiersze czytane partiami (yield_per)
+# i od razu wysyłane do klienta, więc zużycie pamięci nie zależy od rozmiaru tabeli
+EXPORT_BATCH_SIZE = 500
+
+
+def parse_export_bound(value, end=False):
+    # "YYYY-MM-DD" jako koniec zakresu obejmuje cały dzień
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def export_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def export_response(name, queries, fmt):
+    # queries - jedno zapytanie albo lista zapytań o tych samych kolumnach, eksportowanych po kolei
+    if not isinstance(queries, list):
+        queries = [queries]
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for number, query in enumerate(queries):
+            result = db.session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            columns = list(result.keys())
+            if fmt == 'csv':
+                if number == 0:
+                    writer.writerow(columns)
+                for rows in result.partitions():
+                    writer.writerows([[export_value(value) for value in row] for row in rows])
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            else:
+                for rows in result.partitions():
+                    yield ''.join(
+                        json.dumps({column: export_value(value) for column, value in zip(columns, row)}) + '\n'
+                        for row in rows
+                    )
+
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{fmt}'
+    return response
+
+
+def export_arguments():
+    # Wspólne parametry eksportu: format, zakres dat i samochód
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('csv', 'ndjson'):
+        raise ValueError('Format must be csv or ndjson')
+    try:
+        since = parse_export_bound(request.args.get('since'))
+        until = parse_export_bound(request.args.get('until'), end=True)
+    except ValueError:
+        raise ValueError('Invalid date format, expected ISO 8601')
+    car_id = request.args.get('car_id', type=int)
+    return fmt, since, until, car_id
+
+
+# Endpoint do eksportu części
+@bp.route('/export/parts', methods=['GET'])
+def export_parts():
+    try:
+        fmt, _, _, car_id = export_arguments()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    query = parts_with_wear_query().order_by(Part.id)
+    if car_id is not None:
+        query = query.where(Part.car_id == car_id)
+    return export_response('parts', query, fmt)
+
+
+# Endpoint do eksportu historii części (najpierw archiwum, potem historia bieżąca)
+@bp.route('/export/part-history', methods=['GET'])
+def export_part_history():
+    try:
+        fmt, since, until, car_id = export_arguments()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    queries = []
+    for model in (PartHistoryArchive, PartHistory):
+        query = (
+            db.select(
+                model.id,
+                model.part_id,
+                Part.part_number,
+                Part.car_id,
+                model.timestamp,
+                model.changed_field,
+                model.old_value,
+                model.new_value,
+                model.notes
+            )
+            .outerjoin(Part, Part.id == model.part_id)
+            .order_by(model.id)
+        )
+        if since is not None:
+            query = query.where(model.timestamp >= since)
+        if until is not None:
+            query = query.where(model.timestamp < until)
+        if car_id is not None:
+            query = query.where(Part.car_id == car_id)
+        queries.append(query)
+    return export_response('part_history', queries, fmt)
+
+
+# Endpoint do eksportu historii samochodów (najpierw archiwum, potem historia bieżąca)
+@bp.route('/export/car-history', methods=['GET'])
+def export_car_history():
+    try:
+        fmt, since, until, car_id = export_arguments()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    queries = []
+    for model in (CarHistoryArchive, CarHistory):
+        query = (
+            db.select(
+                model.id,
+                model.car_id,
+                Car.chassis_number,
+                model.timestamp,
+                model.changed_field,
+                model.old_value,
+                model.new_value
+            )
+            .outerjoin(Car, Car.id == model.car_id)
+            .order_by(model.id)
+        )
+        if since is not None:
+            query = query.where(model.timestamp >= since)
+        if until is not None:
+            query = query.where(model.timestamp < until)
+        if car_id is not None:
+            query = query.where(model.car_id == car_id)
+        queries.append(query)
+    return export_response('car_history', queries, fmt)
+
+
+# Import masowy (CSV lub NDJSON) typów części, samochodów i części.
+# Dane są czytane strumieniowo, walidowane wiersz po wierszu i zapisywane w paczkach;
+# błędne wiersze trafiają do raportu i nie przerywają importu.
+IMPORT_CHUNK_SIZE = 500
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+
+def iter_import_records(stream, fmt):
+    # Zwraca (numer wiersza, rekord, błąd) dla kolejnych wierszy pliku
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield number, None, 'Row must be a JSON object'
+            continue
+        yield number, record, None
+
+
+def import_value(record, field):
+    # Puste pola z CSV traktujemy jak brak wartości
+    value = record.get(field)
+    if isinstance(value, str):
+        value = value.strip()
+    return None if value in (None, '') else value
+
+
+def import_int(record, field, required=False):
+    value = import_value(record, field)
+    if value is None:
+        if required:
+            raise ValueError(f'Missing {field}')
+        return None
+    try:
+        value = int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f'{field} must be a number')
+    if value < 0:
+        raise ValueError(f'{field} must not be negative')
+    return value
+
+
+def import_text(record, field, max_length=None, required=True):
+    value = import_value(record, field)
+    if value is None:
+        if required:
+            raise ValueError(f'Missing {field}')
+        return None
+    value = str(value)
+    if max_length and len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+class BulkImport:
+    def __init__(self, kind, chunk_size=IMPORT_CHUNK_SIZE):
+        self.kind = kind
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self._pending = []
+        self._cars = None
+        self._part_types = None
+        self._part_numbers = None
+
+    # Słowniki wczytywane raz na import zamiast zapytania dla każdego wiersza
+    def cars(self):
+        if self._cars is None:
+            self._cars = dict(db.session.execute(db.select(Car.chassis_number, Car.id)).all())
+        return self._cars
+
+    def part_types(self):
+        if self._part_types is None:
+            rows = db.session.execute(db.select(PartType.name, PartType.id).order_by(PartType.id.desc())).all()
+            self._part_types = dict(rows)  # Przy powtórzonych nazwach wygrywa najstarszy typ
+        return self._part_types
+
+    def part_numbers(self):
+        if self._part_numbers is None:
+            self._part_numbers = set(db.session.scalars(db.select(Part.part_number)))
+        return self._part_numbers
+
+    def validate_part_type(self, record):
+        name = import_text(record, 'name', max_length=100)
+        if name in self.part_types():
+            raise ValueError(f'Part type {name} already exists')
+        self.part_types()[name] = None
+        return {'name': name, 'max_mileage': import_int(record, 'max_mileage')}
+
+    def validate_car(self, record):
+        chassis_number = import_text(record, 'chassis_number', max_length=3)
+        driver = import_text(record, 'driver', max_length=100)
+        if chassis_number in self.cars():
+            raise ValueError(f'Car {chassis_number} already exists')
+        self.cars()[chassis_number] = None
+        return {'chassis_number': chassis_number, 'driver': driver}
+
+    def validate_part(self, record):
+        name = import_text(record, 'name', max_length=100)
+        part_number = import_text(record, 'part_number', max_length=100)
+        mileage = import_int(record, 'mileage', required=True)
+        notes = import_text(record, 'notes', required=False)
+
+        # Samochód po numerze nadwozia albo po ID
+        chassis_number = import_value(record, 'car_chassis_number')
+        if chassis_number is not None:
+            car_id = self.cars().get(str(chassis_number))
+            if car_id is None:
+                raise ValueError(f'Unknown car {chassis_number}')
+        else:
+            car_id = import_int(record, 'car_id', required=True)
+            if car_id not in self.cars().values():
+                raise ValueError(f'Unknown car_id {car_id}')
+
+        # Typ części po nazwie albo po ID
+        part_type_name = import_value(record, 'part_type')
+        if part_type_name is not None:
+            part_type_id = self.part_types().get(str(part_type_name))
+            if part_type_id is None:
+                raise ValueError(f'Unknown part type {part_type_name}')
+        else:
+            part_type_id = import_int(record, 'part_type_id', required=True)
+            if part_type_id not in self.part_types().values():
+                raise ValueError(f'Unknown part_type_id {part_type_id}')
+
+        if part_number in self.part_numbers():
+            raise ValueError(f'Part number {part_number} already exists')
+        self.part_numbers().add(part_number)
+
+        return {
+            'name': name,
+            'mileage': mileage,
+            'part_number': part_number,
+            'notes': notes,
+            'car_id': car_id,
+            'part_type_id': part_type_id
+        }
+
+    def add_error(self, number, message):
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'error': message})
+
+    def add(self, number, record, error=None):
+        if error is None:
+            validate = {
+                'part-types': self.validate_part_type,
+                'cars': self.validate_car,
+                'parts': self.validate_part,
+            }[self.kind]
+            try:
+                row = validate(record)
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            self.add_error(number, error)
+            return
+
+        self._pending.append((number, row))
+        if len(self._pending) >= self.chunk_size:
+            self.flush()
+
+    def insert(self, rows):
+        table = {'part-types': PartType, 'cars': Car, 'parts': Part}[self.kind].__table__
+        db.session.execute(db.insert(table), rows)
+        if self.kind == 'parts':
+            # Wpis "part_assigned" w historii samochodu, tak jak przy /add-part
+            timestamp = datetime.utcnow()
+            db.session.execute(db.insert(CarHistory.__table__), [{
+                'car_id': row['car_id'],
+                'changed_field': 'part_assigned',
+                'old_value': None,
+                'new_value': row['name'],
+                'timestamp': timestamp
+            } for row in rows])
+
+    def flush(self):
+        if not self._pending:
+            return
+        chunk, self._pending = self._pending, []
+        try:
+            self.insert([row for _, row in chunk])
+            db.session.commit()
+            self.imported += len(chunk)
+        except Exception:
+            # Paczka odrzucona przez bazę - zapisujemy wiersze pojedynczo, żeby wskazać błędne
+            db.session.rollback()
+            for number, row in chunk:
+                try:
+                    self.insert([row])
+                    db.session.commit()
+                    self.imported += 1
+                except Exception as e:
+                    db.session.rollback()
+                    self.add_error(number, str(getattr(e, 'orig', e)))
+        if self.kind == 'cars':
+            self._cars = None  # Nowe samochody dostały ID - odświeżamy słownik przy następnym użyciu
+        elif self.kind == 'part-types':
+            self._part_types = None
+
+    def run(self, records):
+        for number, record, error in records:
+            self.add(number, record, error)
+        self.flush()
+        return {
+            'kind': self.kind,
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+
+
+def import_format(fmt, content_type):
+    if fmt:
+        return fmt
+    return 'csv' if content_type and 'csv' in content_type else 'ndjson'
+
+
+# Endpoint do masowego importu (CSV lub NDJSON przesłane jako treść żądania)
+@bp.route('/import/<kind>', methods=['POST'])
+def import_data(kind):
+    if kind not in ('part-types', 'cars', 'parts'):
+        return jsonify({'error': f'Unknown import kind: {kind}'}), 404
+
+    fmt = import_format(request.args.get('format'), request.content_type)
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Format must be csv or ndjson'}), 400
+
+    try:
+        chunk_size = max(1, int(request.args.get('chunk_size', IMPORT_CHUNK_SIZE)))
+    except ValueError:
+        return jsonify({'error': 'Chunk size must be a number'}), 400
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    report = BulkImport(kind, chunk_size).run(iter_import_records(stream, fmt))
+    return jsonify(report), 200
@@ -0,0 +1,38 @@
+# Pozostały przebieg części (limit typu części minus przebieg) przechowywany w kolumnie
+# part.remaining_mileage i utrzymywany przez triggery w bazie. Wyrażenie obejmuje dwie tabele,
+# więc nie da się go zindeksować bezpośrednio - kolumna z indeksem pozwala wybierać części
+# bliskie wymiany zakresem po indeksie, niezależnie od tego, czy zapis szedł przez ORM czy SQL.
+from sqlalchemy import text
+
+
+# NULL, gdy typ części nie ma limitu przebiegu; "{row}" to NEW w triggerach albo "part"
+REMAINING_MILEAGE_SQL = (
+    "(SELECT CASE WHEN part_type.max_mileage > 0 THEN part_type.max_mileage - {row}.mileage END "
+    "FROM part_type WHERE part_type.id = {row}.part_type_id)"
+)
+
+WEAR_TRIGGERS = {
+    'wear_part_ai': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_ai AFTER INSERT ON part BEGIN "
+        f"UPDATE part SET remaining_mileage = {REMAINING_MILEAGE_SQL.format(row='NEW')} WHERE id = NEW.id; END"
+    ),
+    'wear_part_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_au AFTER UPDATE OF mileage, part_type_id ON part BEGIN "
+        f"UPDATE part SET remaining_mileage = {REMAINING_MILEAGE_SQL.format(row='NEW')} WHERE id = NEW.id; END"
+    ),
+    'wear_part_type_au': (
+        "CREATE TRIGGER IF NOT EXISTS wear_part_type_au AFTER UPDATE OF max_mileage ON part_type BEGIN "
+        "UPDATE part SET remaining_mileage = CASE WHEN NEW.max_mileage > 0 THEN NEW.max_mileage - mileage END "
+        "WHERE part_type_id = NEW.id; END"
+    ),
+}
+
+
+def create_wear_triggers(connection):
+    for statement in WEAR_TRIGGERS.values():
+        connection.execute(text(statement))
+
+
+def refresh_remaining_mileage(connection):
+    # Przeliczenie kolumny dla wszystkich części (migracja, naprawa danych)
+    connection.execute(text(f"UPDATE part SET remaining_mileage = {REMAINING_MILEAGE_SQL.format(row='part')}"))
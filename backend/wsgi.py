@@ -0,0 +1,4 @@
+# Punkt wejścia WSGI dla serwera produkcyjnego: gunicorn -c gunicorn.conf.py wsgi:app
+from app import create_app
+
+app = create_app()
@@ -12,15 +12,14 @@ function CarDetails() {
   const apiUrl = import.meta.env.VITE_BACKEND_URL;
 
   useEffect(() => {
+    // Dane auta i części jednym żądaniem (tylko sekcje wyświetlane na tej stronie)
     axios
-      .get(`${apiUrl}/get-car/${id}`)
-      .then((response) => setCar(response.data))
+      .get(`${apiUrl}/cars/${id}/overview`, { params: { fields: "car,parts" } })
+      .then((response) => {
+        setCar(response.data.car);
+        setParts(response.data.parts);
+      })
       .catch(() => setError("Błąd przy pobieraniu danych samochodu."));
-
-    axios
-      .get(`${apiUrl}/get-parts-for-car/${id}`)
-      .then((response) => setParts(response.data.parts))
-      .catch(() => setError("Błąd przy pobieraniu części."));
   }, [id, apiUrl]);
 
   const getUsageColor = (usage) => {
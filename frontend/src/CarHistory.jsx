@@ -5,6 +5,7 @@ import { useParams } from "react-router-dom";
 function CarHistory() {
   const { carId } = useParams();
   const [history, setHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // Token starszych wpisów historii
   const [carsData, setCarsData] = useState([]);
   const [loading, setLoading] = useState(true);
 
@@ -19,6 +20,7 @@ function CarHistory() {
       .then((response) => {
         console.log("Historia samochodu:", response.data.history);
         setHistory(response.data.history);
+        setNextCursor(response.data.next_cursor);
       })
       .catch((error) =>
         console.error("Błąd przy pobieraniu historii samochodu:", error)
@@ -37,6 +39,19 @@ function CarHistory() {
       );
   }, [carId, apiUrl]);
 
+  // Doczytanie starszych wpisów historii
+  const loadOlderHistory = () => {
+    axios
+      .get(`${apiUrl}/car-history/${carId}`, { params: { cursor: nextCursor } })
+      .then((response) => {
+        setHistory((prev) => [...prev, ...response.data.history]);
+        setNextCursor(response.data.next_cursor);
+      })
+      .catch((error) =>
+        console.error("Błąd przy pobieraniu historii samochodu:", error)
+      );
+  };
+
   // Zamiana ID na chassis_number
   const getChassisNumber = (carId) => {
     if (!carsData.length) return "Ładowanie...";
@@ -88,6 +103,12 @@ function CarHistory() {
           </tbody>
         </table>
       )}
+
+      {nextCursor && (
+        <button onClick={loadOlderHistory} className="btn btn-outline-primary mt-3">
+          Załaduj starsze wpisy
+        </button>
+      )}
     </div>
   );
 }
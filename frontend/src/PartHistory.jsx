@@ -5,6 +5,7 @@ import { useParams } from "react-router-dom";
 function PartHistory() {
   const { partId } = useParams();
   const [history, setHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null); // Token starszych wpisów historii
   const [carsData, setCarsData] = useState([]);
   const [partTypesData, setPartTypesData] = useState([]); // Stan dla typów części
   const [loading, setLoading] = useState(true);
@@ -17,6 +18,7 @@ function PartHistory() {
       .get(`${apiUrl}/part-history/${partId}`)
       .then((response) => {
         setHistory(response.data.history);
+        setNextCursor(response.data.next_cursor);
       })
       .catch((error) => console.error("Błąd przy pobieraniu historii:", error));
 
@@ -38,6 +40,17 @@ function PartHistory() {
       .finally(() => setLoading(false));
   }, [partId, apiUrl]);
 
+  // Doczytanie starszych wpisów historii
+  const loadOlderHistory = () => {
+    axios
+      .get(`${apiUrl}/part-history/${partId}`, { params: { cursor: nextCursor } })
+      .then((response) => {
+        setHistory((prev) => [...prev, ...response.data.history]);
+        setNextCursor(response.data.next_cursor);
+      })
+      .catch((error) => console.error("Błąd przy pobieraniu historii:", error));
+  };
+
   // Funkcja do zamiany ID na chassis_number
   const getChassisNumber = (carId) => {
     const car = carsData.find((car) => car.id === Number(carId));
@@ -58,6 +71,7 @@ function PartHistory() {
         const response = await axios.delete(`${apiUrl}/delete-part-history/${partId}`);
         console.log(response.data.message);
         setHistory([]); // Czyścimy historię po udanym usunięciu
+        setNextCursor(null);
       } catch (error) {
         console.error("Błąd przy kasowaniu historii:", error.response?.data?.error || error.message);
       }
@@ -111,6 +125,12 @@ function PartHistory() {
         </table>
       )}
 
+      {nextCursor && (
+        <button onClick={loadOlderHistory} className="btn btn-outline-primary mt-3 me-2">
+          Załaduj starsze wpisy
+        </button>
+      )}
+
       {/* Przycisk do kasowania historii */}
       <button onClick={deleteHistory} className="btn btn-danger mt-3">
         Usuń historię
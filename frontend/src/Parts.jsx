@@ -1,25 +1,60 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
 import { Link } from "react-router-dom";
 
+const SEARCH_DEBOUNCE_MS = 300; // Zapytanie wysyłamy dopiero po przerwie w pisaniu
+
 function Parts() {
   const [parts, setParts] = useState([]);
   const [searchTerm, setSearchTerm] = useState(""); // Nowy stan dla wyszukiwania
+  const [debouncedSearch, setDebouncedSearch] = useState(""); // Fraza wysyłana do serwera
+  const [sortColumn, setSortColumn] = useState("id"); // Kolumna sortowania
   const [sortOrder, setSortOrder] = useState("asc"); // Stan dla sortowania
+  const [nextCursor, setNextCursor] = useState(null); // Token kolejnej strony z serwera
+  const requestRef = useRef(null); // Bieżące żądanie - nowe anuluje poprzednie, nieaktualne
 
   // Pobieranie zmiennej API URL z pliku .env
   const apiUrl = import.meta.env.VITE_BACKEND_URL;
 
+  // Fraza trafia do serwera po SEARCH_DEBOUNCE_MS bez zmian, a nie po każdym znaku
+  useEffect(() => {
+    const timer = setTimeout(() => setDebouncedSearch(searchTerm), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  // Wyszukiwanie i sortowanie wykonuje serwer - po zmianie pobieramy pierwszą stronę
   useEffect(() => {
     fetchParts();
-  }, []);
+  }, [debouncedSearch, sortColumn, sortOrder]);
+
+  // Przy opuszczeniu strony anulujemy niedokończone żądanie
+  useEffect(() => () => requestRef.current && requestRef.current.abort(), []);
+
+  // Pobiera części z serwera (cursor = null oznacza pierwszą stronę)
+  const fetchParts = (cursor = null) => {
+    const params = { search: debouncedSearch, sort: sortColumn, order: sortOrder };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+
+    // Odpowiedź na wcześniejsze żądanie mogłaby przyjść później i nadpisać wynik nowszego
+    if (requestRef.current) {
+      requestRef.current.abort();
+    }
+    const controller = new AbortController();
+    requestRef.current = controller;
 
-  // Pobiera części z serwera
-  const fetchParts = () => {
     axios
-      .get(`${apiUrl}/get-parts`)  // Korzystamy ze zmiennej środowiskowej
-      .then((response) => setParts(response.data.parts))
-      .catch((error) => console.error("Błąd przy pobieraniu części:", error));
+      .get(`${apiUrl}/get-parts`, { params, signal: controller.signal })  // Korzystamy ze zmiennej środowiskowej
+      .then((response) => {
+        setParts((prev) => (cursor ? [...prev, ...response.data.parts] : response.data.parts));
+        setNextCursor(response.data.next_cursor);
+      })
+      .catch((error) => {
+        if (!axios.isCancel(error)) {
+          console.error("Błąd przy pobieraniu części:", error);
+        }
+      });
   };
 
   // Usuwanie części po potwierdzeniu
@@ -29,39 +64,20 @@ function Parts() {
         .delete(`${apiUrl}/delete-part/${id}`)  // Korzystamy ze zmiennej środowiskowej
         .then(() => {
           alert("Część została usunięta.");
-          fetchParts(); // Odświeżenie listy części po usunięciu
+          setParts((prev) => prev.filter((part) => part.id !== id)); // Usuwamy część z listy bez ponownego pobierania
         })
         .catch((error) => console.error("Błąd przy usuwaniu części:", error));
     }
   };
 
-  // Filtrujemy części na podstawie wpisanego tekstu
-  const filteredParts = parts.filter(
-    (part) =>
-      part.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      part.car_chassis_number.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      part.part_number.toLowerCase().includes(searchTerm.toLowerCase()) // Wyszukiwanie po numerze seryjnym
-  );
-
-  // Funkcja do sortowania części
+  // Funkcja do sortowania części - ponowne kliknięcie tej samej kolumny odwraca kolejność
   const sortParts = (column) => {
-    const sortedParts = [...filteredParts].sort((a, b) => {
-      if (column === "id" || column === "car_chassis_number" || column === "usage_percentage") {
-        if (typeof a[column] === 'string') {
-          return sortOrder === "asc"
-            ? a[column].localeCompare(b[column])
-            : b[column].localeCompare(a[column]);
-        } else {
-          return sortOrder === "asc"
-            ? a[column] - b[column]
-            : b[column] - a[column];
-        }
-      }
-      return 0;
-    });
-
-    setParts(sortedParts);
-    setSortOrder(sortOrder === "asc" ? "desc" : "asc"); // Zmiana kolejności sortowania
+    if (column === sortColumn) {
+      setSortOrder(sortOrder === "asc" ? "desc" : "asc"); // Zmiana kolejności sortowania
+    } else {
+      setSortColumn(column);
+      setSortOrder("asc");
+    }
   };
 
   return (
@@ -105,7 +121,7 @@ function Parts() {
           </tr>
         </thead>
         <tbody>
-          {filteredParts.map((part) => (
+          {parts.map((part) => (
             <tr key={part.id}>
               <td>{part.id}</td>
               <td>{part.car_chassis_number}</td>
@@ -130,6 +146,14 @@ function Parts() {
         </tbody>
       </table>
 
+      {nextCursor && (
+        <div className="text-center">
+          <button className="btn btn-outline-primary" onClick={() => fetchParts(nextCursor)}>
+            Załaduj więcej
+          </button>
+        </div>
+      )}
+
       <div className="mt-4 d-flex justify-content-between">
         <Link to="/" className="btn btn-secondary">Powrót do strony głównej</Link>
       </div>